@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def async_read_view(viewset_class, actions):
+    """Wrap ``viewset_class`` in an async view for ASGI deployments.
+
+    Django 4.0 has no async ORM, so reads run the DRF view in a worker
+    thread that is not tied to the request (``thread_sensitive=False``):
+    queries of concurrent requests overlap and the event loop stays free
+    to accept connections. Writes keep the thread sensitive path Django
+    uses for sync views.
+    """
+    sync_view = viewset_class.as_view(actions)
+
+    def render(request, *args, **kwargs):
+        response = sync_view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def render_read(request, *args, **kwargs):
+        # Worker threads outlive requests, so expire their connections
+        # like the request_started/request_finished handlers would.
+        close_old_connections()
+        try:
+            return render(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    read = sync_to_async(render_read, thread_sensitive=False)
+    write = sync_to_async(render)
+
+    async def view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await read(request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    view.cls = viewset_class
+    view.actions = actions
+    return view
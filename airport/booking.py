@@ -0,0 +1,356 @@
+import contextvars
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from airport.caching import bump_version, flight_version_name
+from airport.models import Flight, Order, SeatHold, SeatInventory, Ticket
+
+# Postgres deadlock_detected and serialization_failure
+RETRYABLE_PGCODES = ("40P01", "40001")
+# Postgres lock_not_available, raised once BOOKING_LOCK_TIMEOUT_MS passes
+LOCK_TIMEOUT_PGCODE = "55P03"
+
+# Set while booking deletes holds whose bits it clears in bulk itself
+releasing_holds = contextvars.ContextVar("releasing_holds", default=False)
+
+
+class BookingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The flight is busy, retry the booking shortly."
+    default_code = "booking_busy"
+
+
+class SeatsUnavailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are already taken."
+    default_code = "seats_unavailable"
+
+    def __init__(self, seats):
+        super().__init__()
+        self.seats = [
+            {"flight": flight_id, "row": row, "seat": seat}
+            for flight_id, row, seat in sorted(seats)
+        ]
+        self.detail = {"detail": self.detail, "seats": self.seats}
+
+
+def _group_places(seats):
+    """Validate ``(flight, row, seat)`` requests and group them by flight."""
+    flights = {}
+    places_by_flight = defaultdict(list)
+    duplicates = []
+    for flight, row, seat in seats:
+        Ticket.validate_ticket(row, seat, flight.airplane, ValidationError)
+        if (row, seat) in places_by_flight[flight.pk]:
+            duplicates.append(
+                f"Seat (row {row}, seat {seat}) on flight "
+                f"{flight.pk} is requested more than once."
+            )
+        flights[flight.pk] = flight
+        places_by_flight[flight.pk].append((row, seat))
+    if duplicates:
+        raise ValidationError({"tickets": duplicates})
+    return flights, places_by_flight
+
+
+def _places_filter(seats):
+    return reduce(
+        or_,
+        (
+            Q(flight_id=flight_id, row=row, seat=seat)
+            for flight_id, row, seat in seats
+        ),
+    )
+
+
+def _claim(user, inventories, places_by_flight):
+    """Make the requested seats free for ``user`` or raise on conflicts.
+
+    Sold seats and seats held by someone else conflict. Holds of ``user``
+    and expired holds of anyone are dropped so the seats can be reused.
+    """
+    conflicts = []
+    held = []
+    for flight_id, places in places_by_flight.items():
+        inventory = inventories[flight_id]
+        for row, seat in places:
+            if inventory.is_taken(row, seat):
+                conflicts.append((flight_id, row, seat))
+            elif inventory.is_held(row, seat):
+                held.append((flight_id, row, seat))
+
+    releasable = []
+    if held:
+        now = timezone.now()
+        for hold in SeatHold.objects.filter(_places_filter(held)):
+            if hold.user_id == user.pk or hold.expires_at <= now:
+                releasable.append(hold.pk)
+            else:
+                conflicts.append((hold.flight_id, hold.row, hold.seat))
+    if conflicts:
+        raise SeatsUnavailable(conflicts)
+
+    if releasable:
+        _delete_holds(releasable)
+    for flight_id, row, seat in held:
+        inventories[flight_id].unhold([(row, seat)])
+
+
+def _delete_holds(pks):
+    """Delete holds without the per-row unhold of ``release_deleted_hold``.
+
+    The caller holds the inventory locks and clears the bits itself.
+    """
+    token = releasing_holds.set(True)
+    try:
+        SeatHold.objects.filter(pk__in=pks).delete()
+    finally:
+        releasing_holds.reset(token)
+
+
+def _save_inventories(inventories):
+    new_inventories = [
+        inventory
+        for inventory in inventories.values()
+        if inventory._state.adding
+    ]
+    SeatInventory.objects.bulk_create(new_inventories)
+    SeatInventory.objects.bulk_update(
+        [
+            inventory
+            for inventory in inventories.values()
+            if inventory not in new_inventories
+        ],
+        SeatInventory.STATE_FIELDS,
+    )
+    for flight_id in inventories:
+        bump_version(flight_version_name(flight_id))
+
+
+def book_tickets(order, tickets_data):
+    """Validate and insert all tickets of ``order`` as one batch.
+
+    Seats are checked against the locked seat inventory of every flight
+    involved, so a booking costs a fixed number of queries no matter how
+    many seats it contains. Seats held by the order's user are converted
+    into tickets. Must be called inside a transaction.
+    """
+    flights, places_by_flight = _group_places(
+        (ticket_data["flight"], ticket_data["row"], ticket_data["seat"])
+        for ticket_data in tickets_data
+    )
+    inventories = SeatInventory.lock(flights.values())
+    _claim(order.user, inventories, places_by_flight)
+
+    tickets = Ticket.objects.bulk_create(
+        [Ticket(order=order, **ticket_data) for ticket_data in tickets_data]
+    )
+    for flight_id, places in places_by_flight.items():
+        inventories[flight_id].take(places)
+    _save_inventories(inventories)
+    return tickets
+
+
+def hold_seats(user, flight, places, ttl):
+    """Hold ``places`` of ``flight`` for ``user`` for ``ttl`` seconds.
+
+    Seats the user already holds are held again with the new expiry.
+    """
+    with transaction.atomic():
+        flights, places_by_flight = _group_places(
+            (flight, row, seat) for row, seat in places
+        )
+        inventories = SeatInventory.lock(flights.values())
+        _claim(user, inventories, places_by_flight)
+
+        expires_at = timezone.now() + timedelta(seconds=ttl)
+        holds = SeatHold.objects.bulk_create(
+            [
+                SeatHold(
+                    flight=flight,
+                    user=user,
+                    row=row,
+                    seat=seat,
+                    expires_at=expires_at,
+                )
+                for row, seat in places_by_flight[flight.pk]
+            ]
+        )
+        inventories[flight.pk].hold(places_by_flight[flight.pk])
+        _save_inventories(inventories)
+    return holds
+
+
+def _release(flight_ids, holds):
+    """Delete ``holds`` of ``flight_ids`` and clear them from inventories.
+
+    Inventories are locked before the holds are read, so holds converted
+    or replaced in the meantime are left alone.
+    """
+    flights = Flight.objects.select_related("airplane").filter(
+        pk__in=flight_ids
+    )
+    inventories = SeatInventory.lock(flights)
+    released = list(
+        holds.filter(flight_id__in=flight_ids).values_list(
+            "pk", "flight_id", "row", "seat"
+        )
+    )
+    _delete_holds([hold[0] for hold in released])
+    for _, flight_id, row, seat in released:
+        inventories[flight_id].unhold([(row, seat)])
+    _save_inventories(inventories)
+    return len(released)
+
+
+def release_holds(holds):
+    with transaction.atomic():
+        return _release(
+            {hold.flight_id for hold in holds},
+            SeatHold.objects.filter(pk__in=[hold.pk for hold in holds]),
+        )
+
+
+def expire_holds(chunk_size=500):
+    """Drop every expired hold, ``chunk_size`` flights per transaction.
+
+    Each chunk costs a fixed number of queries however many holds it
+    drops. Returns the number of holds removed.
+    """
+    expired_holds = SeatHold.objects.filter(expires_at__lte=timezone.now())
+    expired = 0
+    while True:
+        with transaction.atomic():
+            flight_ids = list(
+                expired_holds.order_by("flight_id")
+                .values_list("flight_id", flat=True)
+                .distinct()[:chunk_size]
+            )
+            if not flight_ids:
+                return expired
+            expired += _release(flight_ids, expired_holds)
+
+
+def _inventory_state(inventory):
+    return [
+        bytes(value) if isinstance(value, memoryview) else value
+        for value in (
+            getattr(inventory, field)
+            for field in ("rows", "seats_in_row", *SeatInventory.STATE_FIELDS)
+        )
+    ]
+
+
+def reconcile_inventories(flight_ids, fix=False):
+    """Compare stored seat inventories of ``flight_ids`` with their tickets.
+
+    Returns the ids of flights whose inventory is missing or out of date.
+    With ``fix`` the inventories are locked first and rewritten in bulk.
+    Costs a fixed number of queries however many flights are checked.
+    """
+    with transaction.atomic():
+        flights = Flight.objects.select_related("airplane").filter(
+            pk__in=flight_ids
+        )
+        if fix:
+            stored = SeatInventory.lock(flights)
+        else:
+            stored = SeatInventory.objects.in_bulk(flight_ids)
+        places = {Ticket: defaultdict(list), SeatHold: defaultdict(list)}
+        for model, places_by_flight in places.items():
+            for flight_id, row, seat in model.objects.filter(
+                flight_id__in=flight_ids
+            ).values_list("flight_id", "row", "seat"):
+                places_by_flight[flight_id].append((row, seat))
+
+        missing, outdated = [], []
+        for flight in flights:
+            expected = SeatInventory.build(
+                flight, places[Ticket][flight.pk], places[SeatHold][flight.pk]
+            )
+            inventory = stored.get(flight.pk)
+            if inventory is None or inventory._state.adding:
+                missing.append(expected)
+            elif _inventory_state(inventory) != _inventory_state(expected):
+                expected._state.adding = False
+                outdated.append(expected)
+
+        if fix:
+            SeatInventory.objects.bulk_create(missing)
+            SeatInventory.objects.bulk_update(
+                outdated, ("rows", "seats_in_row", *SeatInventory.STATE_FIELDS)
+            )
+            for inventory in missing + outdated:
+                bump_version(flight_version_name(inventory.flight_id))
+    return sorted(inventory.flight_id for inventory in missing + outdated)
+
+
+def _pgcode(error):
+    return getattr(error.__cause__, "pgcode", None)
+
+
+def _taken_in_database(tickets_data):
+    seats = reduce(
+        or_,
+        (
+            Q(
+                flight=ticket_data["flight"],
+                row=ticket_data["row"],
+                seat=ticket_data["seat"],
+            )
+            for ticket_data in tickets_data
+        ),
+    )
+    return list(
+        Ticket.objects.filter(seats).values_list("flight_id", "row", "seat")
+    )
+
+
+def create_order(tickets_data, **order_data):
+    """Create an order with its tickets, retrying transient conflicts.
+
+    Deadlocks and serialization failures are retried with jittered
+    exponential backoff up to ``BOOKING_MAX_ATTEMPTS`` times. A unique
+    constraint violation means the seats were sold concurrently and is
+    reported as ``SeatsUnavailable`` right away, like seats found taken in
+    the inventory; lock timeouts answer ``BookingBusy``.
+    """
+    max_attempts = getattr(settings, "BOOKING_MAX_ATTEMPTS", 3)
+    backoff = getattr(settings, "BOOKING_RETRY_BACKOFF", 0.05)
+    lock_timeout = getattr(settings, "BOOKING_LOCK_TIMEOUT_MS", 2000)
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with transaction.atomic():
+                if connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            "SET LOCAL lock_timeout = %s", [lock_timeout]
+                        )
+                order = Order.objects.create(**order_data)
+                book_tickets(order, tickets_data)
+                return order
+        except IntegrityError:
+            taken = _taken_in_database(tickets_data)
+            if not taken:
+                raise
+            raise SeatsUnavailable(taken)
+        except OperationalError as error:
+            if _pgcode(error) == LOCK_TIMEOUT_PGCODE:
+                raise BookingBusy() from error
+            if _pgcode(error) not in RETRYABLE_PGCODES:
+                raise
+            if attempt == max_attempts:
+                raise BookingBusy() from error
+            time.sleep(random.uniform(0, backoff * 2 ** (attempt - 1)))
@@ -0,0 +1,148 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = "airport:version:{}"
+PROCESS_LOCAL_BACKENDS = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def get_cache():
+    return caches[getattr(settings, "AIRPORT_CACHE_ALIAS", "default")]
+
+
+def is_process_local():
+    """Whether every process keeps its own copy of the airport cache.
+
+    Versions bumped in one worker are then invisible to the others, which
+    keep serving stale payloads for up to ``REFERENCE_CACHE_TIMEOUT``.
+    """
+    alias = getattr(settings, "AIRPORT_CACHE_ALIAS", "default")
+    return settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_BACKENDS
+
+
+def get_versions(names):
+    """Return the current version token of every name in ``names``.
+
+    Versions that are missing, e.g. after eviction, start from a fresh
+    time based token so payloads cached under an older one never match.
+    """
+    cache = get_cache()
+    keys = {VERSION_KEY.format(name): name for name in names}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_version(name):
+    """Invalidate everything cached under ``name`` now and after commit.
+
+    The second bump drops payloads cached by requests that read the old
+    rows while the transaction was still open.
+    """
+
+    def bump():
+        cache = get_cache()
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def model_version_name(model):
+    return f"model:{model._meta.label_lower}"
+
+
+def flight_version_name(flight_id):
+    return f"flight:{flight_id}"
+
+
+def make_etag(*parts):
+    return '"{}"'.format(
+        hashlib.md5(repr(parts).encode()).hexdigest()
+    )
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match", "")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in (etag, "*"):
+            return True
+    return False
+
+
+class CachedResponseMixin:
+    """Serve responses from the cache with ETag validation.
+
+    Cache entries are keyed by the versions returned from
+    ``get_cache_version_names`` (by default one per model in
+    ``cache_models``, bumped on every save or delete of that model) and
+    answer ``If-None-Match`` with ``304 Not Modified``.
+    """
+
+    cache_models = ()
+
+    def get_cache_version_names(self):
+        return [model_version_name(model) for model in self.cache_models]
+
+    def cached_response(self, request, render):
+        versions = get_versions(self.get_cache_version_names())
+        etag = make_etag(
+            type(self).__name__,
+            self.action,
+            request.get_host(),
+            sorted(self.kwargs.items()),
+            sorted(request.query_params.lists()),
+            sorted(versions.items()),
+        )
+        if etag_matches(request, etag):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+        cache = get_cache()
+        key = f"airport:response:{etag}"
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = render()
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(
+                    key,
+                    response.data,
+                    getattr(settings, "REFERENCE_CACHE_TIMEOUT", 60 * 60),
+                )
+        response["ETag"] = etag
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, lambda: super(CachedRetrieveMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
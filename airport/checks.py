@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from airport.caching import is_process_local
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    workers = getattr(settings, "WEB_CONCURRENCY", 1)
+    if workers <= 1 or not is_process_local():
+        return []
+    return [
+        Warning(
+            f"{workers} workers configured but the airport cache is local "
+            "to each process.",
+            hint=(
+                "Cached responses are invalidated by version keys bumped in "
+                "the process that changed the data, so with several workers "
+                "the others serve stale flights and seat maps. Point "
+                "CACHE_BACKEND at a shared backend such as "
+                "django.core.cache.backends.redis.RedisCache."
+            ),
+            id="airport.W001",
+        )
+    ]
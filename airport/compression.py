@@ -0,0 +1,122 @@
+import gzip
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/vnd.oai.openapi",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+def available_encodings():
+    """Content codings this process can produce, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def accepted_encoding(accept_encoding, encodings=None):
+    """Pick the first of ``encodings`` that ``accept_encoding`` allows."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in encodings or available_encodings():
+        if accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def compress(content, coding):
+    if coding == "br":
+        return brotli.compress(
+            content,
+            mode=brotli.MODE_TEXT,
+            quality=getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5),
+        )
+    return gzip.compress(
+        content,
+        compresslevel=getattr(settings, "COMPRESSION_GZIP_LEVEL", 6),
+        mtime=0,
+    )
+
+
+class CompressionMiddleware:
+    """Compress text responses with brotli or gzip as the client accepts.
+
+    Responses smaller than ``COMPRESSION_MIN_SIZE`` bytes are sent as
+    they are. Streaming responses, e.g. exports, are gzipped on the fly.
+    Strong ETags become weak ones, which ``etag_matches`` still accepts.
+    The middleware follows the sync or async mode of the handler chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(
+            request, await self.get_response(request)
+        )
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "")
+        if response.has_header("Content-Encoding") or not (
+            content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+        if not response.streaming and len(response.content) < getattr(
+            settings, "COMPRESSION_MIN_SIZE", 1024
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = accepted_encoding(
+            request.headers.get("Accept-Encoding", ""),
+            ("gzip",) if response.streaming else None,
+        )
+        if coding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content
+            )
+            del response["Content-Length"]
+        else:
+            compressed = compress(response.content, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = coding
+        return response
@@ -0,0 +1,137 @@
+from collections import defaultdict, namedtuple
+from operator import attrgetter
+
+from django.utils import timezone
+
+from airport.models import Flight
+
+# ``flight`` is the pk of a stored flight, ``item`` the position of an
+# unsaved candidate flight in its request.
+Slot = namedtuple("Slot", ("start", "end", "flight", "item"))
+Candidate = namedtuple(
+    "Candidate",
+    ("item", "flight", "airplane", "crews", "departure_time", "arrival_time"),
+)
+Conflict = namedtuple("Conflict", ("resource", "first", "second"))
+
+RESOURCE_FIELDS = {"airplane": "airplane", "crew": "crews"}
+
+
+def find_overlaps(slots_by_resource):
+    """Yield overlapping slot pairs of every ``(kind, id)`` resource.
+
+    Slots of a resource are swept in start order while remembering the
+    one that ends last, so a resource costs O(n log n). Every slot that
+    overlaps another one is reported at least once, paired with the
+    slot that ends last among those before it.
+    """
+    for resource, slots in slots_by_resource.items():
+        slots.sort(key=attrgetter("start", "end"))
+        latest = None
+        for slot in slots:
+            if latest is not None and slot.start < latest.end:
+                yield Conflict(resource, latest, slot)
+            if latest is None or slot.end > latest.end:
+                latest = slot
+
+
+def _load_slots(slots, start=None, end=None, airplanes=None, crews=None,
+                exclude=()):
+    """Add stored flights overlapping ``start`` - ``end`` to ``slots``."""
+    flights = Flight.objects.all()
+    assignments = Flight.crews.through.objects.all()
+    if exclude:
+        flights = flights.exclude(pk__in=exclude)
+        assignments = assignments.exclude(flight_id__in=exclude)
+    if start is not None:
+        flights = flights.filter(arrival_time__gt=start)
+        assignments = assignments.filter(flight__arrival_time__gt=start)
+    if end is not None:
+        flights = flights.filter(departure_time__lt=end)
+        assignments = assignments.filter(flight__departure_time__lt=end)
+    if airplanes is not None:
+        flights = flights.filter(airplane_id__in=airplanes)
+    if crews is not None:
+        assignments = assignments.filter(crew_id__in=crews)
+
+    sources = [
+        ("airplane", flights.values_list(
+            "airplane_id", "departure_time", "arrival_time", "id"
+        )),
+    ]
+    if crews is None or crews:
+        sources.append(("crew", assignments.values_list(
+            "crew_id",
+            "flight__departure_time",
+            "flight__arrival_time",
+            "flight_id",
+        )))
+    for kind, rows in sources:
+        for resource_id, departure, arrival, flight_id in rows.iterator(
+            chunk_size=5000
+        ):
+            slots[kind, resource_id].append(
+                Slot(departure, arrival, flight_id, None)
+            )
+
+
+def _describe(slot):
+    if slot.item is not None:
+        return f"item {slot.item} of this request"
+    start, end = (
+        timezone.localtime(value).strftime("%Y-%m-%d %H:%M")
+        for value in (slot.start, slot.end)
+    )
+    return f"flight {slot.flight} ({start} - {end})"
+
+
+def check_flights(candidates):
+    """Return scheduling conflicts of ``candidates`` keyed by item.
+
+    Candidates are checked against each other and against stored flights
+    sharing their airplane or a crew member inside the time window they
+    span, which costs two indexed range queries for any number of
+    candidates. Each item maps to errors keyed by serializer field.
+    """
+    if not candidates:
+        return {}
+    slots = defaultdict(list)
+    _load_slots(
+        slots,
+        start=min(candidate.departure_time for candidate in candidates),
+        end=max(candidate.arrival_time for candidate in candidates),
+        airplanes={candidate.airplane for candidate in candidates},
+        crews=set().union(*(candidate.crews for candidate in candidates)),
+        exclude=[c.flight for c in candidates if c.flight is not None],
+    )
+    for candidate in candidates:
+        slot = Slot(
+            candidate.departure_time,
+            candidate.arrival_time,
+            candidate.flight,
+            candidate.item,
+        )
+        slots["airplane", candidate.airplane].append(slot)
+        for crew_id in candidate.crews:
+            slots["crew", crew_id].append(slot)
+
+    conflicts = defaultdict(lambda: defaultdict(list))
+    for conflict in find_overlaps(slots):
+        kind, resource_id = conflict.resource
+        for slot, other in (
+            (conflict.first, conflict.second),
+            (conflict.second, conflict.first),
+        ):
+            if slot.item is not None:
+                conflicts[slot.item][RESOURCE_FIELDS[kind]].append(
+                    f"{kind.capitalize()} {resource_id} is already "
+                    f"assigned to {_describe(other)}."
+                )
+    return {item: dict(errors) for item, errors in conflicts.items()}
+
+
+def schedule_conflicts(start=None, end=None):
+    """Return overlaps of stored flights between ``start`` and ``end``."""
+    slots = defaultdict(list)
+    _load_slots(slots, start=start, end=end)
+    return list(find_overlaps(slots))
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+from collections import namedtuple
+from datetime import date
+
+from django.conf import settings
+
+from airport.models import Flight, Order, Ticket
+
+Export = namedtuple("Export", ["model", "columns"])
+
+EXPORTS = {
+    "flights": Export(
+        Flight,
+        (
+            ("id", "id"),
+            ("route", "route_id"),
+            ("source", "route__source__name"),
+            ("destination", "route__destination__name"),
+            ("airplane", "airplane_id"),
+            ("airplane_name", "airplane__name"),
+            ("departure_time", "departure_time"),
+            ("arrival_time", "arrival_time"),
+            ("tickets_available", "seat_inventory__seats_free"),
+        ),
+    ),
+    "tickets": Export(
+        Ticket,
+        (
+            ("id", "id"),
+            ("order", "order_id"),
+            ("flight", "flight_id"),
+            ("row", "row"),
+            ("seat", "seat"),
+        ),
+    ),
+    "orders": Export(
+        Order,
+        (
+            ("id", "id"),
+            ("user", "user_id"),
+            ("email", "user__email"),
+            ("created_at", "created_at"),
+        ),
+    ),
+}
+
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def export_rows(dataset, chunk_size=None):
+    """Yield rows of ``dataset`` as value tuples in primary key order.
+
+    Rows are fetched ``chunk_size`` at a time through a server-side
+    cursor where the database supports one, so memory use does not
+    grow with the size of the table.
+    """
+    export = EXPORTS[dataset]
+    return (
+        export.model.objects.order_by("pk")
+        .values_list(*(lookup for _, lookup in export.columns))
+        .iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+def _plain(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _batches(rows, chunk_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def render_export(dataset, output_format, chunk_size=None):
+    """Yield ``dataset`` as CSV or NDJSON text, one chunk of rows at a time.
+
+    The CSV header row comes first, NDJSON has one object per line.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    names = [name for name, _ in EXPORTS[dataset].columns]
+    rows = export_rows(dataset, chunk_size)
+
+    if output_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for batch in _batches(rows, chunk_size):
+            writer.writerows(
+                [_plain(value) for value in row] for row in batch
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    elif output_format == "ndjson":
+        for batch in _batches(rows, chunk_size):
+            yield "".join(
+                json.dumps(
+                    dict(zip(names, (_plain(value) for value in row)))
+                )
+                + "\n"
+                for row in batch
+            )
+    else:
+        raise ValueError(f"Unknown export format: {output_format}")
@@ -0,0 +1,227 @@
+import csv
+import json
+from collections import namedtuple
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.caching import (
+    bump_version,
+    flight_version_name,
+    model_version_name,
+)
+from airport.itineraries import flight_index
+from airport.models import Airplane, Airport, Flight, Route, SeatInventory
+
+ImportResult = namedtuple(
+    "ImportResult", ["rows", "created", "updated", "errors"]
+)
+
+
+def read_schedule(lines, input_format):
+    """Yield timetable rows of a CSV or NDJSON file as dicts."""
+    if input_format == "csv":
+        yield from csv.DictReader(lines)
+    elif input_format == "ndjson":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown schedule format: {input_format}")
+
+
+def _parse_time(value):
+    parsed = parse_datetime(value or "")
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ScheduleImporter:
+    """Upsert flights from timetable rows, a chunk per transaction.
+
+    Each row names its ``source`` and ``destination`` airports, the
+    ``airplane`` and the ``departure_time`` and ``arrival_time``. Airports
+    and routes that do not exist yet are created, which needs a route
+    ``distance``. Airports, routes and airplanes are resolved through
+    in-memory maps, so a chunk costs a fixed number of queries. Airport
+    names are not unique, so rows naming an airport that several share
+    are skipped. A flight is matched by its route, airplane and departure
+    time; matches get the new arrival time, other rows become new flights.
+    """
+
+    def __init__(self, chunk_size=5000):
+        self.chunk_size = chunk_size
+        self.airports = {}
+        for airport_id, name in Airport.objects.values_list("id", "name"):
+            # None marks a name shared by several airports
+            self.airports[name] = (
+                None if name in self.airports else airport_id
+            )
+        self.routes = {
+            (source_id, destination_id): route_id
+            for route_id, source_id, destination_id in
+            Route.objects.values_list("id", "source_id", "destination_id")
+        }
+        self.airplanes = {
+            airplane.name: airplane for airplane in Airplane.objects.all()
+        }
+        self.touched = set()
+
+    def run(self, rows):
+        rows = iter(rows)
+        total = created = updated = 0
+        errors = []
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            valid, chunk_errors = self._validate(chunk, start=total + 1)
+            airports, routes = dict(self.airports), dict(self.routes)
+            try:
+                with transaction.atomic():
+                    flights = self._resolve_routes(valid, chunk_errors)
+                    chunk_created, chunk_updated = self._save(flights)
+            except Exception:
+                # Ids of airports and routes rolled back with the chunk
+                self.airports, self.routes = airports, routes
+                raise
+            errors += chunk_errors
+            total += len(chunk)
+            created += chunk_created
+            updated += chunk_updated
+        self._invalidate()
+        return ImportResult(total, created, updated, errors)
+
+    def _validate(self, chunk, start):
+        """Return valid rows of ``chunk`` with their times, and row errors.
+
+        Nothing is written here, airports and routes are created by
+        ``_resolve_routes`` inside the chunk's transaction.
+        """
+        errors = []
+        valid = []
+        times = [
+            (_parse_time(row.get("departure_time")),
+             _parse_time(row.get("arrival_time")))
+            for row in chunk
+        ]
+        for line, row, (departure, arrival) in zip(
+            range(start, start + len(chunk)), chunk, times
+        ):
+            if departure is None or arrival is None:
+                errors.append((line, "Invalid departure or arrival time."))
+            elif departure >= arrival:
+                errors.append(
+                    (line, "Arrival time must be after departure time.")
+                )
+            elif row.get("airplane") not in self.airplanes:
+                errors.append(
+                    (line, f"Unknown airplane: {row.get('airplane')}")
+                )
+            elif not row.get("source") or not row.get("destination"):
+                errors.append((line, "Source and destination are required."))
+            elif self.airports.get(row["source"], 0) is None or (
+                self.airports.get(row["destination"], 0) is None
+            ):
+                errors.append(
+                    (line, "Several airports share the source or "
+                           "destination name.")
+                )
+            else:
+                valid.append((line, row, departure, arrival))
+        return valid, errors
+
+    def _resolve_routes(self, valid, errors):
+        """Create missing airports and routes, return flights keyed for
+        matching."""
+        new_airports = {
+            name: Airport(
+                name=name, closest_big_city=row.get(f"{end}_city") or name
+            )
+            for _, row, _, _ in valid
+            for end, name in (("source", row["source"]),
+                              ("destination", row["destination"]))
+            if name not in self.airports
+        }
+        for airport in Airport.objects.bulk_create(new_airports.values()):
+            self.airports[airport.name] = airport.id
+        if new_airports:
+            self.touched.add(Airport)
+
+        resolved = []
+        new_routes = {}
+        for line, row, departure, arrival in valid:
+            key = (self.airports[row["source"]],
+                   self.airports[row["destination"]])
+            if key not in self.routes and key not in new_routes:
+                try:
+                    distance = int(row.get("distance") or "")
+                except (TypeError, ValueError):
+                    errors.append(
+                        (line, "A distance is required for a new route.")
+                    )
+                    continue
+                new_routes[key] = Route(
+                    source_id=key[0], destination_id=key[1], distance=distance
+                )
+            resolved.append((key, row["airplane"], departure, arrival))
+        for route in Route.objects.bulk_create(new_routes.values()):
+            self.routes[route.source_id, route.destination_id] = route.id
+        if new_routes:
+            self.touched.add(Route)
+
+        flights = {}
+        for key, airplane_name, departure, arrival in resolved:
+            airplane = self.airplanes[airplane_name]
+            flights[self.routes[key], airplane.id, departure] = Flight(
+                route_id=self.routes[key],
+                airplane=airplane,
+                departure_time=departure,
+                arrival_time=arrival,
+            )
+        return flights
+
+    def _save(self, flights):
+        existing = {
+            (route_id, airplane_id, departure): (flight_id, arrival)
+            for flight_id, route_id, airplane_id, departure, arrival in
+            Flight.objects.filter(
+                route_id__in={key[0] for key in flights},
+                departure_time__in={key[2] for key in flights},
+            ).values_list(
+                "id", "route_id", "airplane_id",
+                "departure_time", "arrival_time",
+            )
+        }
+        new_flights = []
+        changed_flights = []
+        for key, flight in flights.items():
+            if key not in existing:
+                new_flights.append(flight)
+                continue
+            flight.id, arrival = existing[key]
+            if arrival != flight.arrival_time:
+                changed_flights.append(flight)
+
+        Flight.objects.bulk_create(new_flights)
+        SeatInventory.objects.bulk_create(
+            [
+                SeatInventory.build(flight, taken=(), held=())
+                for flight in new_flights
+            ]
+        )
+        Flight.objects.bulk_update(changed_flights, ["arrival_time"])
+        for flight in changed_flights:
+            bump_version(flight_version_name(flight.id))
+        if new_flights or changed_flights:
+            self.touched.add(Flight)
+        return len(new_flights), len(changed_flights)
+
+    def _invalidate(self):
+        for model in self.touched:
+            bump_version(model_version_name(model))
+        if self.touched:
+            flight_index.invalidate()
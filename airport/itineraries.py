@@ -0,0 +1,249 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict, namedtuple
+from itertools import count
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from airport.models import Flight
+
+Leg = namedtuple(
+    "Leg",
+    (
+        "departure_time",
+        "arrival_time",
+        "flight_id",
+        "route_id",
+        "source_id",
+        "destination_id",
+        "distance",
+    ),
+)
+Itinerary = namedtuple("Itinerary", ("legs", "duration", "distance"))
+
+
+class FlightIndex:
+    """Adjacency index of upcoming flights keyed by source airport.
+
+    The index is loaded lazily, patched when a flight or route changes in
+    this process and fully reloaded every ``ITINERARY_INDEX_TTL`` seconds
+    to pick up changes made elsewhere. Patches replace the leg lists they
+    touch instead of changing them, so searches read a consistent
+    snapshot without taking the lock. Reloads are built outside the lock
+    by one thread while the others keep searching the previous index.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._legs_by_source = None
+        self._legs_by_flight = {}
+        self._flights_by_route = defaultdict(set)
+        self._loaded_at = 0.0
+
+    @staticmethod
+    def _cutoff():
+        lookback = getattr(
+            settings, "ITINERARY_INDEX_LOOKBACK", timedelta(days=1)
+        )
+        return timezone.now() - lookback
+
+    def _is_fresh(self):
+        ttl = getattr(settings, "ITINERARY_INDEX_TTL", 300)
+        return (
+            self._legs_by_source is not None
+            and time.monotonic() - self._loaded_at <= ttl
+        )
+
+    def _snapshot(self):
+        """Return the current legs by source, reloading them when stale."""
+        legs_by_source = self._legs_by_source
+        if self._is_fresh():
+            return legs_by_source
+        if self._reload_lock.acquire(blocking=legs_by_source is None):
+            try:
+                if not self._is_fresh():
+                    return self.reload()
+            finally:
+                self._reload_lock.release()
+        return self._legs_by_source or legs_by_source or {}
+
+    def reload(self):
+        rows = (
+            Flight.objects.filter(departure_time__gte=self._cutoff())
+            .values_list(
+                "departure_time",
+                "arrival_time",
+                "id",
+                "route_id",
+                "route__source_id",
+                "route__destination_id",
+                "route__distance",
+            )
+            .iterator(chunk_size=5000)
+        )
+        legs_by_source = defaultdict(list)
+        legs_by_flight = {}
+        flights_by_route = defaultdict(set)
+        for row in rows:
+            leg = Leg(*row)
+            legs_by_source[leg.source_id].append(leg)
+            legs_by_flight[leg.flight_id] = leg
+            flights_by_route[leg.route_id].add(leg.flight_id)
+        for legs in legs_by_source.values():
+            legs.sort()
+
+        with self._lock:
+            self._legs_by_source = legs_by_source
+            self._legs_by_flight = legs_by_flight
+            self._flights_by_route = flights_by_route
+            self._loaded_at = time.monotonic()
+        return legs_by_source
+
+    def invalidate(self):
+        with self._lock:
+            self._legs_by_source = None
+
+    def _remove(self, flight_id):
+        leg = self._legs_by_flight.pop(flight_id, None)
+        if leg is None:
+            return
+        legs = list(self._legs_by_source[leg.source_id])
+        del legs[bisect_left(legs, leg)]
+        self._legs_by_source[leg.source_id] = legs
+        self._flights_by_route[leg.route_id].discard(flight_id)
+
+    def _add(self, leg):
+        legs = list(self._legs_by_source.get(leg.source_id, ()))
+        insort(legs, leg)
+        self._legs_by_source[leg.source_id] = legs
+        self._legs_by_flight[leg.flight_id] = leg
+        self._flights_by_route[leg.route_id].add(leg.flight_id)
+
+    def flight_saved(self, flight):
+        with self._lock:
+            if self._legs_by_source is None:
+                return
+            self._remove(flight.id)
+            departure_time, arrival_time = (
+                timezone.make_aware(value) if timezone.is_naive(value)
+                else value
+                for value in (flight.departure_time, flight.arrival_time)
+            )
+            if departure_time >= self._cutoff():
+                route = flight.route
+                self._add(
+                    Leg(
+                        departure_time,
+                        arrival_time,
+                        flight.id,
+                        route.id,
+                        route.source_id,
+                        route.destination_id,
+                        route.distance,
+                    )
+                )
+
+    def flight_deleted(self, flight_id):
+        with self._lock:
+            if self._legs_by_source is not None:
+                self._remove(flight_id)
+
+    def route_saved(self, route):
+        with self._lock:
+            if self._legs_by_source is None:
+                return
+            for flight_id in list(self._flights_by_route.get(route.id, ())):
+                leg = self._legs_by_flight[flight_id]
+                self._remove(flight_id)
+                self._add(
+                    leg._replace(
+                        source_id=route.source_id,
+                        destination_id=route.destination_id,
+                        distance=route.distance,
+                    )
+                )
+
+    def search(
+            self,
+            source_id,
+            destination_id,
+            departure_from,
+            departure_to,
+            max_legs=3,
+            min_connection=timedelta(minutes=45),
+            max_connection=timedelta(hours=24),
+            sort="duration",
+            limit=20,
+    ):
+        """Return the ``limit`` best flight chains from source to destination.
+
+        The first leg departs within ``[departure_from, departure_to)`` and
+        each following leg departs between ``min_connection`` and
+        ``max_connection`` after the previous one lands. Airports are never
+        revisited within one itinerary. Chains are explored best first by
+        ``sort`` (duration or distance, which only grow as legs are added),
+        so they come out ranked. The search stops after ``limit`` of them
+        and explores at most ``ITINERARY_MAX_EXPANSIONS`` chains.
+        """
+        legs_by_source = self._snapshot()
+        max_expansions = getattr(settings, "ITINERARY_MAX_EXPANSIONS", 20000)
+
+        def departures(airport_id, start, end):
+            legs = legs_by_source.get(airport_id, ())
+            index = bisect_left(legs, (start,))
+            while index < len(legs) and legs[index].departure_time < end:
+                yield legs[index]
+                index += 1
+
+        def cost(path, distance):
+            duration = path[-1].arrival_time - path[0].departure_time
+            if sort == "distance":
+                return distance, duration
+            return duration, distance
+
+        tiebreak = count()
+        heap = []
+
+        def push(path, distance):
+            explored = next(tiebreak)
+            if explored < max_expansions:
+                heapq.heappush(
+                    heap, (cost(path, distance), explored, path, distance)
+                )
+
+        for leg in departures(source_id, departure_from, departure_to):
+            if leg.destination_id != source_id:
+                push((leg,), leg.distance)
+
+        itineraries = []
+        while heap and len(itineraries) < limit:
+            _, _, path, distance = heapq.heappop(heap)
+            last = path[-1]
+            if last.destination_id == destination_id:
+                itineraries.append(
+                    Itinerary(
+                        legs=list(path),
+                        duration=last.arrival_time - path[0].departure_time,
+                        distance=distance,
+                    )
+                )
+                continue
+            if len(path) >= max_legs:
+                continue
+            visited = {source_id, *(leg.destination_id for leg in path)}
+            for leg in departures(
+                    last.destination_id,
+                    last.arrival_time + min_connection,
+                    last.arrival_time + max_connection,
+            ):
+                if leg.destination_id not in visited:
+                    push(path + (leg,), distance + leg.distance)
+        return itineraries
+
+
+flight_index = FlightIndex()
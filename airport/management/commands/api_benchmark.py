@@ -0,0 +1,251 @@
+import json
+import random
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from airport.management.commands.seed_benchmark_data import (
+    PASSWORD,
+    USER_DOMAIN,
+)
+from airport.models import Flight, SeatInventory
+
+SCENARIOS = (
+    "token_obtain",
+    "token_refresh",
+    "flights_list",
+    "flights_retrieve",
+    "orders_list",
+    "orders_create",
+)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Benchmark the main API endpoints against seeded data and write "
+        "latency, queries per request and RPS to a JSON file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=SCENARIOS,
+            help="Scenario to run, repeatable (default all)",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per scenario"
+        )
+        parser.add_argument(
+            "--server",
+            help="Base URL of a running server; the Django test client "
+                 "is used in-process by default",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark-results.json",
+            help="JSON file the results are written to",
+        )
+        parser.add_argument(
+            "--compare", help="Earlier results file to print deltas against"
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.server = options["server"]
+        self.client = Client()
+        user = (
+            get_user_model()
+            .objects.filter(email__endswith=f"@{USER_DOMAIN}")
+            .order_by("pk")
+            .first()
+        )
+        flight_ids = list(
+            Flight.objects.order_by("?").values_list("pk", flat=True)[:500]
+        )
+        if user is None or not flight_ids:
+            raise CommandError("Run seed_benchmark_data first")
+        self.flight_ids = flight_ids
+        self.free_seats = self.find_free_seats(options["requests"])
+
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            _, tokens, _ = self.request(
+                "POST",
+                reverse("user:token_obtain_pair"),
+                {"email": user.email, "password": PASSWORD},
+            )
+            if not isinstance(tokens, dict) or "access" not in tokens:
+                raise CommandError("Could not obtain a JWT for " + user.email)
+            self.credentials = {"email": user.email, "password": PASSWORD}
+            self.tokens = tokens
+
+            results = {}
+            for scenario in options["scenarios"] or SCENARIOS:
+                results[scenario] = self.run(scenario, options["requests"])
+                self.print_result(scenario, results[scenario])
+
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": self.git_commit(),
+            "target": self.server or "test client",
+            "requests_per_scenario": options["requests"],
+            "scenarios": results,
+        }
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+        if options["compare"]:
+            self.compare(options["compare"], results)
+
+    def find_free_seats(self, count):
+        """Pick free seats of the sampled flights for order creation."""
+        seats = []
+        inventories = SeatInventory.objects.filter(
+            flight_id__in=self.flight_ids
+        )
+        for inventory in inventories.iterator():
+            taken = set(inventory.taken_places())
+            for row in range(1, inventory.rows + 1):
+                for seat in range(1, inventory.seats_in_row + 1):
+                    if (row, seat) not in taken and len(seats) < count:
+                        seats.append((inventory.flight_id, row, seat))
+        self.rng.shuffle(seats)
+        return seats
+
+    def scenario_request(self, scenario):
+        """Return method, path, body and token of one request."""
+        access = self.tokens["access"]
+        if scenario == "token_obtain":
+            return ("POST", reverse("user:token_obtain_pair"),
+                    self.credentials, None)
+        if scenario == "token_refresh":
+            return ("POST", reverse("user:token_refresh"),
+                    {"refresh": self.tokens["refresh"]}, None)
+        if scenario == "flights_list":
+            return "GET", reverse("airport:flight-list"), None, access
+        if scenario == "flights_retrieve":
+            flight_id = self.rng.choice(self.flight_ids)
+            path = reverse("airport:flight-detail", args=[flight_id])
+            return "GET", path, None, access
+        if scenario == "orders_list":
+            return "GET", reverse("airport:order-list"), None, access
+        if not self.free_seats:
+            raise CommandError("No free seats left for orders_create")
+        flight_id, row, seat = self.free_seats.pop()
+        tickets = [{"flight": flight_id, "row": row, "seat": seat}]
+        return ("POST", reverse("airport:order-list"),
+                {"tickets": tickets}, access)
+
+    def run(self, scenario, total):
+        latencies = []
+        queries = []
+        codes = Counter()
+        started = time.perf_counter()
+        for _ in range(total):
+            method, path, data, token = self.scenario_request(scenario)
+            request_started = time.perf_counter()
+            code, _, query_count = self.request(method, path, data, token)
+            latencies.append(time.perf_counter() - request_started)
+            codes[code] += 1
+            if query_count is not None:
+                queries.append(query_count)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+
+        def percentile(fraction):
+            index = round(fraction * (len(latencies) - 1))
+            return round(latencies[index] * 1000, 2)
+
+        return {
+            "requests": total,
+            "rps": round(total / elapsed, 1),
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "queries_per_request": (
+                round(sum(queries) / len(queries), 2) if queries else None
+            ),
+            "status": {str(code): count for code, count in codes.items()},
+        }
+
+    def request(self, method, path, data=None, token=None):
+        """Send one request, return status, decoded body and query count."""
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        body = json.dumps(data) if data is not None else None
+        if self.server is None:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.generic(
+                    method,
+                    path,
+                    body or "",
+                    content_type="application/json",
+                    **headers,
+                )
+            try:
+                payload = json.loads(response.content or b"null")
+            except ValueError:
+                payload = None
+            return response.status_code, payload, len(captured)
+
+        request = urllib.request.Request(
+            self.server.rstrip("/") + path,
+            data=body.encode() if body else None,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read()), None
+        except urllib.error.HTTPError as error:
+            return error.code, None, None
+
+    def print_result(self, scenario, result):
+        queries = result["queries_per_request"]
+        self.stdout.write(
+            f"{scenario:<18} {result['rps']:>8.1f} req/s  "
+            f"p50 {result['p50_ms']:>7.1f} ms  "
+            f"p95 {result['p95_ms']:>7.1f} ms  "
+            f"p99 {result['p99_ms']:>7.1f} ms  "
+            f"queries {queries if queries is not None else '-'}  "
+            f"{result['status']}"
+        )
+
+    def compare(self, path, results):
+        with open(path) as previous_file:
+            previous = json.load(previous_file)["scenarios"]
+        self.stdout.write(f"Compared with {path}:")
+        for scenario, result in results.items():
+            if scenario not in previous:
+                continue
+            before = previous[scenario]
+            deltas = (
+                f"{key} {before.get(key)} -> {result[key]}"
+                for key in ("rps", "p50_ms", "p95_ms", "queries_per_request")
+            )
+            self.stdout.write(f"{scenario:<18} " + "  ".join(deltas))
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
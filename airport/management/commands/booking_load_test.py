@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Flight, SeatInventory
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Fire parallel bookings against one flight and report status "
+        "codes, latency and inventory consistency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("flight", type=int, help="Flight id to book")
+        parser.add_argument(
+            "--bookings", type=int, default=100, help="Number of orders"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=20, help="Parallel threads"
+        )
+        parser.add_argument(
+            "--seats", type=int, default=1, help="Seats per order"
+        )
+        parser.add_argument(
+            "--contended",
+            action="store_true",
+            help="Make every order request the same seats",
+        )
+        parser.add_argument(
+            "--user",
+            help="Email of the booking user (defaults to first superuser)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            flight = Flight.objects.select_related("airplane").get(
+                pk=options["flight"]
+            )
+        except Flight.DoesNotExist:
+            raise CommandError(f"Flight {options['flight']} does not exist")
+
+        users = get_user_model().objects.order_by("pk")
+        if options["user"]:
+            user = users.filter(email=options["user"]).first()
+        else:
+            user = users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("No booking user found, pass --user")
+
+        seats = options["seats"]
+        places = [
+            divmod(index, flight.airplane.seats_in_row)
+            for index in range(flight.airplane.capacity)
+        ]
+        payloads = []
+        for number in range(options["bookings"]):
+            start = 0 if options["contended"] else number * seats
+            payloads.append(
+                {
+                    "tickets": [
+                        {"row": row + 1, "seat": seat + 1, "flight": flight.pk}
+                        for row, seat in places[start:start + seats]
+                    ]
+                }
+            )
+
+        self.stdout.write(
+            f"Booking flight {flight.pk} with {len(payloads)} orders "
+            f"on {options['workers']} threads..."
+        )
+        started = time.perf_counter()
+        results = self.run_bookings(user, payloads, options["workers"])
+        self.report(results, time.perf_counter() - started)
+        self.check_inventory(flight, results)
+
+    @staticmethod
+    def run_bookings(user, payloads, workers):
+        """POST every payload to the order endpoint from parallel threads."""
+        url = reverse("airport:order-list")
+        pending = queue.Queue()
+        for payload in payloads:
+            pending.put(payload)
+        results = []
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                while True:
+                    try:
+                        payload = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    response = client.post(url, payload, format="json")
+                    results.append(
+                        (response.status_code, time.perf_counter() - started)
+                    )
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return results
+
+    def report(self, results, elapsed):
+        for code, count in sorted(Counter(c for c, _ in results).items()):
+            self.stdout.write(f"  HTTP {code}: {count}")
+        latencies = sorted(latency for _, latency in results)
+        if not latencies:
+            return
+
+        def percentile(fraction):
+            return latencies[round(fraction * (len(latencies) - 1))] * 1000
+
+        self.stdout.write(
+            f"  {len(results) / elapsed:.1f} orders/s, "
+            f"p50 {percentile(0.5):.1f} ms, "
+            f"p95 {percentile(0.95):.1f} ms, "
+            f"max {percentile(1):.1f} ms"
+        )
+
+    def check_inventory(self, flight, results):
+        inventory = SeatInventory.objects.get(flight=flight)
+        tickets = flight.tickets.count()
+        if inventory.seats_taken != tickets:
+            raise CommandError(
+                f"Inventory out of sync: {inventory.seats_taken} seats "
+                f"taken vs {tickets} tickets"
+            )
+        if any(code >= 500 for code, _ in results):
+            raise CommandError("Some bookings failed with server errors")
+        self.stdout.write(
+            self.style.SUCCESS(f"Inventory consistent: {tickets} tickets")
+        )
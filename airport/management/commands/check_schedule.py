@@ -0,0 +1,72 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from airport.conflicts import schedule_conflicts
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Report airplanes and crew members assigned to overlapping flights."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="start",
+            help="Only flights landing after this date or datetime",
+        )
+        parser.add_argument(
+            "--to",
+            dest="end",
+            help="Only flights departing before this date or datetime",
+        )
+        parser.add_argument(
+            "--max-report",
+            type=int,
+            default=50,
+            help="Conflicts listed in the report",
+        )
+
+    def handle(self, *args, **options):
+        window = {
+            name: self.parse_moment(options[name])
+            for name in ("start", "end")
+            if options[name]
+        }
+
+        started = time.perf_counter()
+        conflicts = schedule_conflicts(**window)
+        elapsed = time.perf_counter() - started
+
+        for conflict in conflicts[:options["max_report"]]:
+            kind, resource_id = conflict.resource
+            self.stdout.write(
+                f"{kind.capitalize()} {resource_id}: flight "
+                f"{conflict.first.flight} overlaps flight "
+                f"{conflict.second.flight}"
+            )
+        self.stdout.write(
+            f"Found {len(conflicts)} conflicts in {elapsed:.1f}s"
+        )
+        if conflicts:
+            raise CommandError("The schedule has conflicts")
+
+    @staticmethod
+    def parse_moment(value):
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is not None:
+                    parsed = datetime.combine(day, datetime.min.time())
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError(f"Invalid date or datetime: {value}")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.booking import expire_holds
+
+
+class Command(BaseCommand):
+    help = "Drop expired seat holds in bulk."  # noqa: VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Flights processed per transaction",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep sweeping every INTERVAL seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_holds(chunk_size=options["chunk_size"])
+            self.stdout.write(f"Expired {expired} seat holds")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
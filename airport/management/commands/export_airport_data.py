@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from airport.exports import CONTENT_TYPES, EXPORTS, render_export
+
+
+class Command(BaseCommand):
+    help = "Export flights, tickets or orders as CSV or NDJSON"  # noqa: VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(EXPORTS))
+        parser.add_argument(
+            "--output-format",
+            choices=list(CONTENT_TYPES),
+            default="csv",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to instead of standard output",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Rows fetched from the database at a time",
+        )
+
+    def handle(self, *args, **options):
+        chunks = render_export(
+            options["dataset"],
+            options["output_format"],
+            chunk_size=options["chunk_size"],
+        )
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", newline="") as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,59 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.imports import ScheduleImporter, read_schedule
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Create or update flights, routes and airports "
+        "from a CSV or NDJSON timetable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Timetable file")
+        parser.add_argument(
+            "--input-format",
+            choices=["csv", "ndjson"],
+            help="Defaults to the file extension",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows saved per transaction",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=20,
+            help="Invalid rows listed in the report",
+        )
+
+    def handle(self, *args, **options):
+        input_format = options["input_format"] or (
+            os.path.splitext(options["path"])[1].lstrip(".").lower()
+        )
+        if input_format not in ("csv", "ndjson"):
+            raise CommandError("Pass --input-format csv or ndjson")
+
+        started = time.perf_counter()
+        try:
+            with open(options["path"], newline="") as lines:
+                result = ScheduleImporter(options["chunk_size"]).run(
+                    read_schedule(lines, input_format)
+                )
+        except OSError as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+
+        for line, message in result.errors[:options["max_errors"]]:
+            self.stderr.write(f"Row {line}: {message}")
+        self.stdout.write(
+            f"Read {result.rows} rows in {elapsed:.1f}s "
+            f"({result.rows / max(elapsed, 1e-9):.0f} rows/s): "
+            f"{result.created} flights created, {result.updated} updated, "
+            f"{len(result.errors)} rows skipped"
+        )
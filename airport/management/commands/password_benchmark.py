@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils.module_loading import import_string
+
+from user.hashers import hashing_pool
+
+PASSWORD = "benchmark password"
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Measure hashes per second and per core of every configured "
+        "password hasher, one at a time and through the hashing pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hasher",
+            action="append",
+            dest="hashers",
+            help="Hasher algorithm to run, repeatable (default all)",
+        )
+        parser.add_argument(
+            "--hashes", type=int, default=20, help="Hashes per measurement"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "PASSWORD_HASH_WORKERS", 2),
+            help="Hashing pool size of the concurrent measurement",
+        )
+        parser.add_argument("--output", help="JSON file for the results")
+
+    def handle(self, *args, **options):
+        results = {}
+        for path in settings.PASSWORD_HASHERS:
+            hasher = import_string(path)()
+            if options["hashers"] and (
+                hasher.algorithm not in options["hashers"]
+            ):
+                continue
+            try:
+                if hasher.library:
+                    hasher._load_library()
+            except ValueError as error:
+                self.stdout.write(f"{hasher.algorithm:<16} skipped: {error}")
+                continue
+            results[hasher.algorithm] = self.measure(
+                path, hasher, options["hashes"], options["workers"]
+            )
+            self.print_result(hasher.algorithm, results[hasher.algorithm])
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    @staticmethod
+    def measure(path, hasher, hashes, workers):
+        started = time.perf_counter()
+        for _ in range(hashes):
+            hasher.encode(PASSWORD, hasher.salt())
+        serial = hashes / (time.perf_counter() - started)
+
+        cores = min(workers, os.cpu_count() or 1)
+        with override_settings(
+            PASSWORD_HASHERS=[path],
+            PASSWORD_HASH_WORKERS=workers,
+            PASSWORD_HASH_QUEUE=hashes,
+            REQUEST_THREADS=None,
+        ):
+            hashing_pool.shutdown()
+            try:
+                with ThreadPoolExecutor(hashes) as clients:
+                    started = time.perf_counter()
+                    list(
+                        clients.map(
+                            hashing_pool.make_password, [PASSWORD] * hashes
+                        )
+                    )
+                    pooled = hashes / (time.perf_counter() - started)
+            finally:
+                hashing_pool.shutdown()
+        return {
+            "hash_ms": round(1000 / serial, 1),
+            "hashes_per_second": round(serial, 1),
+            "pool_workers": workers,
+            "pool_hashes_per_second": round(pooled, 1),
+            "pool_hashes_per_second_per_core": round(pooled / cores, 1),
+        }
+
+    def print_result(self, algorithm, result):
+        self.stdout.write(
+            f"{algorithm:<16} {result['hash_ms']:>8.1f} ms/hash  "
+            f"{result['hashes_per_second']:>7.1f} hash/s on one core  "
+            f"{result['pool_hashes_per_second']:>7.1f} hash/s with "
+            f"{result['pool_workers']} workers "
+            f"({result['pool_hashes_per_second_per_core']:.1f} per core)"
+        )
@@ -0,0 +1,77 @@
+import glob
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.perf import load_snapshots
+
+SORT_KEYS = {
+    "total": lambda metrics: metrics["wall_seconds"].total,
+    "p95": lambda metrics: metrics["wall_seconds"].quantile(0.95),
+    "count": lambda metrics: metrics["wall_seconds"].count,
+    "queries": lambda metrics: metrics["db_queries"].total,
+}
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Summarise request metrics recorded by PerfMiddleware per view."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=getattr(settings, "PERF_METRICS_DIR", None),
+            help="Directory of perf-<pid>.json snapshots "
+                 "(default PERF_METRICS_DIR)",
+        )
+        parser.add_argument(
+            "--sort", choices=list(SORT_KEYS), default="total"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Views listed"
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete the snapshots after reporting",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dir"]:
+            raise CommandError("Set PERF_METRICS_DIR or pass --dir")
+        views = load_snapshots(options["dir"])
+        if not views:
+            self.stdout.write("No requests recorded")
+            return
+
+        self.stdout.write(
+            f"{'view':<40} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'queries':>7} {'db ms':>7} {'ser ms':>7} "
+            f"{'render ms':>9} {'kB':>7}"
+        )
+        ranked = sorted(
+            views.items(),
+            key=lambda item: SORT_KEYS[options["sort"]](item[1]),
+            reverse=True,
+        )
+        for view, metrics in ranked[:options["limit"]]:
+            wall = metrics["wall_seconds"]
+            count = max(wall.count, 1)
+            sized = max(metrics["response_bytes"].count, 1)
+            self.stdout.write(
+                f"{view[:40]:<40} {wall.count:>7} "
+                f"{wall.quantile(0.5) * 1000:>8.1f} "
+                f"{wall.quantile(0.95) * 1000:>8.1f} "
+                f"{wall.quantile(0.99) * 1000:>8.1f} "
+                f"{metrics['db_queries'].total / count:>7.1f} "
+                f"{metrics['db_seconds'].total / count * 1000:>7.1f} "
+                f"{metrics['serialize_seconds'].total / count * 1000:>7.1f} "
+                f"{metrics['render_seconds'].total / count * 1000:>9.1f} "
+                f"{metrics['response_bytes'].total / sized / 1000:>7.1f}"
+            )
+
+        if options["reset"]:
+            for path in glob.glob(os.path.join(options["dir"], "perf-*")):
+                os.remove(path)
@@ -0,0 +1,113 @@
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from itertools import count, cycle
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ("/api/airport/flights/",)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Fire concurrent GETs at running servers, e.g. the WSGI and the "
+        "ASGI deployment, and compare throughput and latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "servers",
+            nargs="+",
+            help="Base URLs to compare (ex. http://localhost:8001)",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path requested in turn, repeatable "
+                 "(default /api/airport/flights/)",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=1000, help="Requests per server"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=50, help="Parallel clients"
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=30, help="Seconds per request"
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or DEFAULT_PATHS
+        failed = False
+        for server in options["servers"]:
+            urls = [server.rstrip("/") + path for path in paths]
+            self.stdout.write(
+                f"{server}: {options['requests']} requests "
+                f"from {options['concurrency']} clients"
+            )
+            started = time.perf_counter()
+            results = self.run_requests(
+                urls,
+                options["requests"],
+                options["concurrency"],
+                options["timeout"],
+            )
+            self.report(results, time.perf_counter() - started)
+            failed = failed or any(
+                code is None or code >= 500 for code, _ in results
+            )
+        if failed:
+            raise CommandError("Some requests failed")
+
+    @staticmethod
+    def run_requests(urls, total, concurrency, timeout):
+        """GET ``urls`` in turn ``total`` times from parallel threads."""
+        tickets = count()
+        next_url = cycle(urls).__next__
+        lock = threading.Lock()
+        results = []
+
+        def worker():
+            while next(tickets) < total:
+                with lock:
+                    url = next_url()
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(url, timeout=timeout) as res:
+                        res.read()
+                        code = res.status
+                except urllib.error.HTTPError as error:
+                    code = error.code
+                except OSError:
+                    code = None
+                results.append((code, time.perf_counter() - started))
+
+        threads = [
+            threading.Thread(target=worker) for _ in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def report(self, results, elapsed):
+        codes = Counter(code for code, _ in results)
+        for code, number in sorted(codes.items(), key=lambda item: str(item)):
+            self.stdout.write(f"  HTTP {code or 'error'}: {number}")
+        latencies = sorted(latency for _, latency in results)
+        if not latencies:
+            return
+
+        def percentile(fraction):
+            return latencies[round(fraction * (len(latencies) - 1))] * 1000
+
+        self.stdout.write(
+            f"  {len(results) / elapsed:.1f} requests/s, "
+            f"p50 {percentile(0.5):.1f} ms, "
+            f"p95 {percentile(0.95):.1f} ms, "
+            f"p99 {percentile(0.99):.1f} ms"
+        )
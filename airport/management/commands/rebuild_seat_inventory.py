@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from airport.booking import reconcile_inventories
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Rebuild seat inventories from tickets and holds, "
+        "or only report the ones that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report drifted inventories, exit 1 if any",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Flights processed per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Chunks processed in parallel",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        fix = not options["verify"]
+        flight_ids = list(
+            Flight.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        chunks = [
+            flight_ids[start:start + chunk_size]
+            for start in range(0, len(flight_ids), chunk_size)
+        ]
+
+        def reconcile(chunk):
+            try:
+                return reconcile_inventories(chunk, fix=fix)
+            finally:
+                if options["workers"] > 1:
+                    connections.close_all()
+
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(options["workers"]) as executor:
+                results = list(executor.map(reconcile, chunks))
+        else:
+            results = [reconcile(chunk) for chunk in chunks]
+        drifted = [flight_id for result in results for flight_id in result]
+
+        if drifted:
+            self.stdout.write(
+                f"{len(drifted)} of {len(flight_ids)} seat inventories "
+                f"{'rebuilt' if fix else 'drifted'}: "
+                + ", ".join(map(str, drifted))
+            )
+        else:
+            self.stdout.write(
+                f"All {len(flight_ids)} seat inventories are up to date"
+            )
+        if drifted and not fix:
+            raise CommandError("Seat inventories are out of date")
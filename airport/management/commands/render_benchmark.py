@@ -0,0 +1,106 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from airport.compression import available_encodings, compress
+from airport.models import Flight, Order
+from airport.renderers import ORJSONRenderer
+from airport.serializers import FlightListSerializer, OrderListSerializer
+from airport.views import FlightViewSet
+
+RENDERERS = {"json": JSONRenderer, "orjson": ORJSONRenderer}
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Compare render time and response bytes of the JSON renderers and "
+        "compressed sizes on flight and order list payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=1000, help="Objects per payload"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Renders per measurement"
+        )
+        parser.add_argument("--output", help="JSON file for the results")
+
+    def handle(self, *args, **options):
+        payloads = self.payloads(options["rows"])
+        if not any(payloads.values()):
+            raise CommandError("No flights or orders, seed some data first")
+
+        results = {}
+        for name, data in payloads.items():
+            results[name] = self.measure(data, options["repeat"])
+            for renderer, result in results[name]["renderers"].items():
+                self.stdout.write(
+                    f"{name:<8} {renderer:<7} "
+                    f"{result['render_ms']:>8.2f} ms  "
+                    f"{result['bytes']:>9} bytes"
+                )
+            for coding, result in results[name]["compression"].items():
+                self.stdout.write(
+                    f"{name:<8} {coding:<7} "
+                    f"{result['compress_ms']:>8.2f} ms  "
+                    f"{result['bytes']:>9} bytes"
+                )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    @staticmethod
+    def payloads(rows):
+        """Serialize list pages the way the list endpoints query them."""
+        flights = FlightViewSet.queryset.order_by("departure_time", "id")
+        orders = Order.objects.prefetch_related(
+            "tickets",
+            Prefetch(
+                "tickets__flight",
+                queryset=Flight.objects.with_tickets_available()
+                .select_related(
+                    "route__source", "route__destination", "airplane"
+                ),
+            ),
+        ).order_by("-created_at", "-id")
+        return {
+            "flights": FlightListSerializer(flights[:rows], many=True).data,
+            "orders": OrderListSerializer(orders[:rows], many=True).data,
+        }
+
+    @staticmethod
+    def timed(function, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        elapsed = time.perf_counter() - started
+        return result, round(elapsed / repeat * 1000, 2)
+
+    def measure(self, data, repeat):
+        renderers = {}
+        content = b""
+        for name, renderer_class in RENDERERS.items():
+            renderer = renderer_class()
+            content, render_ms = self.timed(
+                lambda: renderer.render(data), repeat
+            )
+            renderers[name] = {"render_ms": render_ms, "bytes": len(content)}
+        compression = {}
+        for coding in available_encodings():
+            compressed, compress_ms = self.timed(
+                lambda: compress(content, coding), repeat
+            )
+            compression[coding] = {
+                "compress_ms": compress_ms,
+                "bytes": len(compressed),
+            }
+        return {
+            "rows": len(data),
+            "renderers": renderers,
+            "compression": compression,
+        }
@@ -0,0 +1,247 @@
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from airport.caching import bump_version, model_version_name
+from airport.itineraries import flight_index
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    SeatInventory,
+    Ticket,
+)
+
+AIRPORT_PREFIX = "Bench"
+USER_DOMAIN = "benchmark.local"
+PASSWORD = "benchmark"
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Bulk insert a synthetic, reproducible dataset for benchmarks. "
+        f"Users are user<N>@{USER_DOMAIN} with password {PASSWORD}."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ("airports", 50),
+            ("routes", 500),
+            ("airplanes", 100),
+            ("flights", 10000),
+            ("users", 100),
+            ("orders", 5000),
+        ):
+            parser.add_argument(f"--{name}", type=int, default=default)
+        parser.add_argument(
+            "--tickets-per-order", type=int, default=2
+        )
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Random seed"
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously seeded benchmark data first",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        with transaction.atomic():
+            if options["clear"]:
+                self.clear()
+            airports = self.seed_airports(options["airports"])
+            routes = self.seed_routes(airports, options["routes"])
+            airplanes, crews = self.seed_fleet(options["airplanes"])
+            flights = self.seed_flights(
+                routes, airplanes, crews, options["flights"]
+            )
+            users = self.seed_users(options["users"])
+            tickets = self.seed_orders(
+                users,
+                flights,
+                options["orders"],
+                options["tickets_per_order"],
+            )
+            self.seed_inventories(flights, tickets)
+            for model in (Airport, Route, AirplaneType, Airplane, Crew):
+                bump_version(model_version_name(model))
+        flight_index.invalidate()
+        self.stdout.write(
+            f"Seeded {len(airports)} airports, {len(routes)} routes, "
+            f"{len(airplanes)} airplanes, {len(flights)} flights, "
+            f"{len(users)} users, {options['orders']} orders and "
+            f"{len(tickets)} tickets in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+    def clear(self):
+        get_user_model().objects.filter(
+            email__endswith=f"@{USER_DOMAIN}"
+        ).delete()
+        Airport.objects.filter(name__startswith=AIRPORT_PREFIX).delete()
+        Airplane.objects.filter(name__startswith=AIRPORT_PREFIX).delete()
+        AirplaneType.objects.filter(name__startswith=AIRPORT_PREFIX).delete()
+        Crew.objects.filter(last_name__startswith=AIRPORT_PREFIX).delete()
+
+    def seed_airports(self, count):
+        return Airport.objects.bulk_create(
+            [
+                Airport(
+                    name=f"{AIRPORT_PREFIX} Airport {number}",
+                    closest_big_city=f"City {number}",
+                )
+                for number in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def seed_routes(self, airports, count):
+        pairs = set()
+        count = min(count, len(airports) * (len(airports) - 1))
+        while len(pairs) < count:
+            pairs.add(tuple(self.rng.sample(airports, 2)))
+        return Route.objects.bulk_create(
+            [
+                Route(
+                    source=source,
+                    destination=destination,
+                    distance=self.rng.randint(200, 9000),
+                )
+                for source, destination in pairs
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def seed_fleet(self, count):
+        airplane_types = AirplaneType.objects.bulk_create(
+            [
+                AirplaneType(name=f"{AIRPORT_PREFIX} {name}")
+                for name in ("Narrow body", "Wide body", "Regional")
+            ]
+        )
+        airplanes = Airplane.objects.bulk_create(
+            [
+                Airplane(
+                    name=f"{AIRPORT_PREFIX} Airplane {number}",
+                    rows=self.rng.randint(20, 40),
+                    seats_in_row=self.rng.choice((4, 6)),
+                    airplane_type=self.rng.choice(airplane_types),
+                )
+                for number in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        # Each airplane gets its own crew so that no one is double booked.
+        assignments = [
+            (
+                airplane,
+                Crew(
+                    first_name=f"Crew {number}",
+                    last_name=f"{AIRPORT_PREFIX} {airplane.pk}",
+                ),
+            )
+            for airplane in airplanes
+            for number in range(3)
+        ]
+        Crew.objects.bulk_create(
+            [crew for _, crew in assignments], batch_size=BATCH_SIZE
+        )
+        crews_by_airplane = defaultdict(list)
+        for airplane, crew in assignments:
+            crews_by_airplane[airplane.pk].append(crew)
+        return airplanes, crews_by_airplane
+
+    def seed_flights(self, routes, airplanes, crews, count):
+        start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        clock = {airplane.pk: start for airplane in airplanes}
+        flights = []
+        for number in range(count):
+            airplane = airplanes[number % len(airplanes)]
+            route = self.rng.choice(routes)
+            departure = clock[airplane.pk] + timedelta(
+                hours=self.rng.randint(1, 12)
+            )
+            arrival = departure + timedelta(
+                minutes=30 + route.distance * 60 // 800
+            )
+            clock[airplane.pk] = arrival
+            flights.append(
+                Flight(
+                    route=route,
+                    airplane=airplane,
+                    departure_time=departure,
+                    arrival_time=arrival,
+                )
+            )
+        Flight.objects.bulk_create(flights, batch_size=BATCH_SIZE)
+        Flight.crews.through.objects.bulk_create(
+            [
+                Flight.crews.through(flight_id=flight.pk, crew_id=crew.pk)
+                for flight in flights
+                for crew in crews[flight.airplane.pk]
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return flights
+
+    def seed_users(self, count):
+        password = make_password(PASSWORD)
+        return get_user_model().objects.bulk_create(
+            [
+                get_user_model()(
+                    email=f"user{number}@{USER_DOMAIN}", password=password
+                )
+                for number in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def seed_orders(self, users, flights, count, tickets_per_order):
+        orders = Order.objects.bulk_create(
+            [Order(user=self.rng.choice(users)) for _ in range(count)],
+            batch_size=BATCH_SIZE,
+        )
+        sold = {}
+        tickets = []
+        for order in orders:
+            for _ in range(tickets_per_order):
+                flight = self.rng.choice(flights)
+                index = sold.get(flight.pk, 0)
+                if index >= flight.airplane.capacity:
+                    continue
+                sold[flight.pk] = index + 1
+                row, seat = divmod(index, flight.airplane.seats_in_row)
+                tickets.append(
+                    Ticket(
+                        order=order, flight=flight, row=row + 1, seat=seat + 1
+                    )
+                )
+        return Ticket.objects.bulk_create(tickets, batch_size=BATCH_SIZE)
+
+    def seed_inventories(self, flights, tickets):
+        taken = defaultdict(list)
+        for ticket in tickets:
+            taken[ticket.flight.pk].append((ticket.row, ticket.seat))
+        SeatInventory.objects.bulk_create(
+            [
+                SeatInventory.build(
+                    flight, taken=taken[flight.pk], held=()
+                )
+                for flight in flights
+            ],
+            batch_size=BATCH_SIZE,
+        )
@@ -0,0 +1,86 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from airport.perf import RequestStats, current_request, registry
+
+
+class PerfMiddleware:
+    """Record wall time, queries, serialization and render time and size
+    per DRF action.
+
+    Views are labelled ``ViewSet.action`` (e.g. ``FlightViewSet.list``),
+    other views by their URL name. Queries are counted by the execute
+    wrapper installed on every database connection, which also follows
+    the request into worker threads started with ``sync_to_async``.
+    Under ASGI the middleware stays async, so requests do not pay for a
+    switch to a thread and back.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = current_request.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.observe(stats, response)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.observe(stats, response)
+        return response
+
+    @staticmethod
+    def observe(stats, response):
+        registry.observe(
+            stats.view or "unresolved",
+            {
+                "wall_seconds": time.perf_counter() - stats.started,
+                "db_queries": stats.queries,
+                "db_seconds": stats.db_seconds,
+                "serialize_seconds": stats.serialize_seconds,
+                "render_seconds": stats.render_seconds,
+                "response_bytes": (
+                    None if response.streaming else len(response.content)
+                ),
+            },
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = current_request.get()
+        viewset = getattr(view_func, "cls", None)
+        method = request.method.lower()
+        if viewset is not None:
+            action = (getattr(view_func, "actions", None) or {}).get(
+                method, method
+            )
+            stats.view = f"{viewset.__name__}.{action}"
+        else:
+            stats.view = request.resolver_match.view_name or method
+
+    def process_template_response(self, request, response):
+        stats = current_request.get()
+        stats.render_started = time.perf_counter()
+
+        def rendered(response):
+            stats.render_seconds = time.perf_counter() - stats.render_started
+
+        response.add_post_render_callback(rendered)
+        return response
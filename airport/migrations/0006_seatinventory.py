@@ -0,0 +1,73 @@
+# Generated by Django 4.0.4 on 2026-10-17 05:50
+
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CHUNK_SIZE = 2000
+
+
+def build_seat_inventories(apps, schema_editor):
+    Flight = apps.get_model('airport', 'Flight')
+    Ticket = apps.get_model('airport', 'Ticket')
+    SeatInventory = apps.get_model('airport', 'SeatInventory')
+
+    flights = Flight.objects.select_related('airplane').order_by('pk')
+    last_pk = 0
+    while True:
+        chunk = list(flights.filter(pk__gt=last_pk)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        last_pk = chunk[-1].pk
+        places = defaultdict(list)
+        for flight_id, row, seat in Ticket.objects.filter(
+            flight__in=chunk
+        ).values_list('flight_id', 'row', 'seat'):
+            places[flight_id].append((row, seat))
+
+        inventories = []
+        for flight in chunk:
+            rows = flight.airplane.rows
+            seats_in_row = flight.airplane.seats_in_row
+            seat_map = bytearray(-(-rows * seats_in_row // 8))
+            for row, seat in places[flight.pk]:
+                if row <= rows and seat <= seats_in_row:
+                    index = (row - 1) * seats_in_row + (seat - 1)
+                    seat_map[index >> 3] |= 1 << (index & 7)
+            inventories.append(
+                SeatInventory(
+                    flight=flight,
+                    rows=rows,
+                    seats_in_row=seats_in_row,
+                    seats_taken=sum(
+                        bin(byte).count('1') for byte in seat_map
+                    ),
+                    seat_map=bytes(seat_map),
+                )
+            )
+        SeatInventory.objects.bulk_create(inventories)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0005_alter_flight_crews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatInventory',
+            fields=[
+                ('flight', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seat_inventory', serialize=False, to='airport.flight')),
+                ('rows', models.IntegerField()),
+                ('seats_in_row', models.IntegerField()),
+                ('seats_taken', models.IntegerField(default=0)),
+                ('seat_map', models.BinaryField(default=bytes)),
+            ],
+        ),
+        migrations.RunPython(
+            build_seat_inventories, migrations.RunPython.noop
+        ),
+    ]
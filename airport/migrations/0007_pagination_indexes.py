@@ -0,0 +1,21 @@
+# Generated by Django 4.0.4 on 2026-10-17 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0006_seatinventory'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['departure_time', 'id'], name='flight_departure_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.4 on 2026-10-17 05:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('airport', '0008_flight_departure_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatinventory',
+            name='hold_map',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AddField(
+            model_name='seatinventory',
+            name='seats_held',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row', models.IntegerField()),
+                ('seat', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to='airport.flight')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['row', 'seat'],
+                'unique_together': {('flight', 'row', 'seat')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.4 on 2026-10-17 06:01
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_seats_free(apps, schema_editor):
+    SeatInventory = apps.get_model('airport', 'SeatInventory')
+    SeatInventory.objects.update(
+        seats_free=F('rows') * F('seats_in_row')
+        - F('seats_taken')
+        - F('seats_held')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0009_seat_holds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatinventory',
+            name='seats_free',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_seats_free, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='seatinventory',
+            index=models.Index(fields=['seats_free', 'flight'], name='inventory_seats_free_idx'),
+        ),
+    ]
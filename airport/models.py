@@ -1,7 +1,8 @@
 import os
 import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.template.defaultfilters import slugify
@@ -55,6 +56,22 @@ class Airplane(models.Model):
     def capacity(self) -> int:
         return self.rows * self.seats_in_row
 
+    def save(
+            self,
+            force_insert=False,
+            force_update=False,
+            using=None,
+            update_fields=None
+    ):
+        with transaction.atomic():
+            super().save(force_insert, force_update, using, update_fields)
+            resized = SeatInventory.objects.filter(
+                flight__airplane=self
+            ).exclude(rows=self.rows, seats_in_row=self.seats_in_row)
+            for inventory in resized.select_related("flight"):
+                inventory.flight.airplane = self
+                SeatInventory.rebuild(inventory.flight)
+
     def __str__(self) -> str:
         return self.name
 
@@ -71,6 +88,18 @@ class Crew(models.Model):
         return self.first_name + " " + self.last_name
 
 
+class FlightQuerySet(models.QuerySet):
+    def with_tickets_available(self):
+        """Annotate free seats from the flight's seat inventory.
+
+        Every flight gets its inventory row when it is created, drifted or
+        missing rows are repaired by ``rebuild_seat_inventory``.
+        """
+        return self.annotate(
+            tickets_available=F("seat_inventory__seats_free")
+        )
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         Route,
@@ -84,6 +113,19 @@ class Flight(models.Model):
     arrival_time = models.DateTimeField()
     crews = models.ManyToManyField(Crew, blank=True, related_name="flights")
 
+    objects = FlightQuerySet.as_manager()
+
+    def save(
+            self,
+            force_insert=False,
+            force_update=False,
+            using=None,
+            update_fields=None
+    ):
+        with transaction.atomic():
+            super().save(force_insert, force_update, using, update_fields)
+            SeatInventory.rebuild(self)
+
     def __str__(self) -> str:
         return (
             f"Flight {self.id} from {self.route.source} "
@@ -91,6 +133,22 @@ class Flight(models.Model):
             f"on {self.departure_time.strftime('%Y-%m-%d %H:%M')}"
         )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"],
+                name="flight_departure_id_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+            models.Index(
+                fields=["airplane", "departure_time"],
+                name="flight_airplane_departure_idx",
+            ),
+        ]
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -105,6 +163,12 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="order_user_created_id_idx",
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -153,7 +217,27 @@ class Ticket(models.Model):
             update_fields=None
     ):
         self.full_clean()
-        return super().save(force_insert, force_update, using, update_fields)
+        with transaction.atomic():
+            adding = self._state.adding
+            previous_flight_id = None
+            if not adding:
+                previous_flight_id = (
+                    Ticket.objects.filter(pk=self.pk)
+                    .values_list("flight_id", flat=True)
+                    .first()
+                )
+            super().save(force_insert, force_update, using, update_fields)
+            if adding:
+                inventory = SeatInventory.lock([self.flight])[self.flight_id]
+                inventory.take([(self.row, self.seat)])
+                inventory.save()
+                return
+            # A ticket moved to another flight frees its seat on the old one.
+            flights = Flight.objects.select_related("airplane").filter(
+                pk__in={self.flight_id, previous_flight_id} - {None}
+            )
+            for flight in flights.order_by("pk"):
+                SeatInventory.rebuild(flight)
 
     def __str__(self):
         return f"{str(self.flight)} (Row: {self.row}, Seat: {self.seat})"
@@ -161,3 +245,229 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("flight", "row", "seat")
         ordering = ["row", "seat"]
+
+
+class SeatHold(models.Model):
+    """Temporary claim on a seat that expires unless turned into a ticket."""
+
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return (
+            f"{str(self.flight)} (Row: {self.row}, Seat: {self.seat}) "
+            f"held until {self.expires_at}"
+        )
+
+    class Meta:
+        unique_together = ("flight", "row", "seat")
+        ordering = ["row", "seat"]
+
+
+class SeatInventory(models.Model):
+    """Seat occupancy of a flight kept as row-major bitmaps.
+
+    Bit ``(row - 1) * seats_in_row + (seat - 1)`` of ``seat_map`` is set
+    for every sold seat and the same bit of ``hold_map`` for every held
+    one, so availability and seat maps never have to scan tickets. The
+    counters are denormalized per flight so lists can filter and sort by
+    availability through an index.
+    """
+
+    flight = models.OneToOneField(
+        Flight,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="seat_inventory",
+    )
+    rows = models.IntegerField()
+    seats_in_row = models.IntegerField()
+    seats_taken = models.IntegerField(default=0)
+    seat_map = models.BinaryField(default=bytes)
+    seats_held = models.IntegerField(default=0)
+    hold_map = models.BinaryField(default=bytes)
+    seats_free = models.IntegerField(default=0)
+
+    STATE_FIELDS = (
+        "seats_taken", "seat_map", "seats_held", "hold_map", "seats_free"
+    )
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def tickets_available(self) -> int:
+        return self.seats_free
+
+    def _seat_index(self, row, seat) -> int:
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def _is_set(self, bitmap, row, seat) -> bool:
+        index = self._seat_index(row, seat)
+        return (
+            index >> 3 < len(bitmap)
+            and bool(bitmap[index >> 3] >> (index & 7) & 1)
+        )
+
+    def _mark(self, bitmap_field, counter_field, places, value):
+        bitmap = bytearray(getattr(self, bitmap_field))
+        bitmap.extend(bytes(-(-self.capacity // 8) - len(bitmap)))
+        counter = getattr(self, counter_field)
+        for row, seat in places:
+            index = self._seat_index(row, seat)
+            bit = 1 << (index & 7)
+            if bool(bitmap[index >> 3] & bit) == value:
+                continue
+            bitmap[index >> 3] ^= bit
+            counter += 1 if value else -1
+        setattr(self, bitmap_field, bytes(bitmap))
+        setattr(self, counter_field, counter)
+        self.seats_free = self.capacity - self.seats_taken - self.seats_held
+
+    def _places(self, bitmap):
+        for byte_index, byte in enumerate(bytes(bitmap)):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    row, seat = divmod(byte_index * 8 + bit, self.seats_in_row)
+                    yield row + 1, seat + 1
+
+    def occupancy(self) -> bytes:
+        """Row-major bitmap of sold or held seats, lowest bit first."""
+        size = -(-self.capacity // 8)
+        return bytes(
+            taken | held
+            for taken, held in zip(
+                bytes(self.seat_map).ljust(size, b"\0")[:size],
+                bytes(self.hold_map).ljust(size, b"\0")[:size],
+            )
+        )
+
+    def occupancy_runs(self) -> list:
+        """Row-major lengths of alternating free and occupied seat runs.
+
+        The first run counts free seats and may be empty.
+        """
+        occupancy = self.occupancy()
+        runs = [0]
+        occupied = False
+        for index in range(self.capacity):
+            if bool(occupancy[index >> 3] >> (index & 7) & 1) != occupied:
+                occupied = not occupied
+                runs.append(0)
+            runs[-1] += 1
+        return runs
+
+    def is_taken(self, row, seat) -> bool:
+        return self._is_set(self.seat_map, row, seat)
+
+    def take(self, places):
+        self._mark("seat_map", "seats_taken", places, True)
+
+    def release(self, places):
+        self._mark("seat_map", "seats_taken", places, False)
+
+    def taken_places(self):
+        return self._places(self.seat_map)
+
+    def is_held(self, row, seat) -> bool:
+        return self._is_set(self.hold_map, row, seat)
+
+    def hold(self, places):
+        self._mark("hold_map", "seats_held", places, True)
+
+    def unhold(self, places):
+        self._mark("hold_map", "seats_held", places, False)
+
+    def held_places(self):
+        return self._places(self.hold_map)
+
+    @classmethod
+    def build(cls, flight, taken=None, held=None):
+        """Build the inventory of ``flight`` without saving it.
+
+        Sold and held places are read from the database unless given.
+        """
+        airplane = flight.airplane
+        map_size = -(-airplane.capacity // 8)
+        inventory = cls(
+            flight=flight,
+            rows=airplane.rows,
+            seats_in_row=airplane.seats_in_row,
+            seat_map=bytes(map_size),
+            hold_map=bytes(map_size),
+            seats_free=airplane.capacity,
+        )
+        for model, places, mark in ((Ticket, taken, inventory.take),
+                                    (SeatHold, held, inventory.hold)):
+            if places is None and flight.pk:
+                places = model.objects.filter(flight=flight).values_list(
+                    "row", "seat"
+                )
+            mark(
+                (row, seat)
+                for row, seat in places or ()
+                if row <= airplane.rows and seat <= airplane.seats_in_row
+            )
+        return inventory
+
+    @classmethod
+    def rebuild(cls, flight):
+        locked = cls.objects.select_for_update().filter(flight=flight)
+        list(locked.values("pk"))
+        inventory = cls.build(flight)
+        inventory.save()
+        return inventory
+
+    @classmethod
+    def lock(cls, flights):
+        """Return inventories of ``flights`` locked for update until commit.
+
+        Rows are locked in primary key order so that concurrent bookings
+        spanning several flights cannot deadlock each other. Missing
+        inventories are built but left unsaved.
+        """
+        flights = {flight.pk: flight for flight in flights}
+        inventories = {
+            inventory.flight_id: inventory
+            for inventory in cls.objects.select_for_update()
+            .filter(flight__in=flights)
+            .order_by("pk")
+        }
+        for flight_id, flight in flights.items():
+            inventory = inventories.get(flight_id)
+            if inventory is None:
+                inventories[flight_id] = cls.build(flight)
+            else:
+                inventory.flight = flight
+                inventory.seat_map = bytes(inventory.seat_map)
+                inventory.hold_map = bytes(inventory.hold_map)
+        return inventories
+
+    def __str__(self):
+        return (
+            f"{str(self.flight)} "
+            f"({self.tickets_available}/{self.capacity} available)"
+        )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["seats_free", "flight"],
+                name="inventory_seats_free_idx",
+            ),
+        ]
@@ -0,0 +1,118 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    _reverse_ordering,
+)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor pagination keyed on every field of the ordering.
+
+    DRF's cursor keeps only the first ordering field and skips ties with
+    an offset, which loops or loses rows once a tie group grows past
+    ``offset_cutoff``. Here the cursor holds the values of all ordering
+    fields of the last (or first) row of the page, and the next page is
+    the rows strictly after that tuple. The ordering must end in a
+    unique field and name attributes of the paginated objects.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = _reverse_ordering(self.ordering) if reverse else (
+            self.ordering
+        )
+
+        queryset = queryset.order_by(*ordering)
+        position = None
+        if self.cursor is not None:
+            position = self.decode_position(self.cursor.position)
+            try:
+                queryset = queryset.filter(self.after(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if self.page:
+            self.previous_position = self.get_position(self.page[0])
+            self.next_position = self.get_position(self.page[-1])
+        else:
+            self.previous_position = self.next_position = (
+                self.cursor.position if self.cursor else None
+            )
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    @staticmethod
+    def after(ordering, position):
+        """Rows ordered strictly after ``position`` in ``ordering``."""
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            conditions.append(
+                Q(
+                    **{
+                        previous.lstrip("-"): value
+                        for previous, value in zip(ordering[:index], position)
+                    },
+                    **{f"{name}__{lookup}": position[index]},
+                )
+            )
+        return reduce(or_, conditions)
+
+    def get_position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            values.append(value)
+        return json.dumps(values)
+
+    def decode_position(self, encoded):
+        try:
+            position = json.loads(encoded)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self.previous_position)
+        )
@@ -0,0 +1,299 @@
+import atexit
+import contextvars
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+TIME_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)
+
+METRICS = {
+    "wall_seconds": TIME_BUCKETS,
+    "db_queries": QUERY_BUCKETS,
+    "db_seconds": TIME_BUCKETS,
+    "serialize_seconds": TIME_BUCKETS,
+    "render_seconds": TIME_BUCKETS,
+    "response_bytes": SIZE_BUCKETS,
+}
+
+current_request = contextvars.ContextVar("perf_request", default=None)
+
+# Histograms of exited processes, folded together by fold_snapshots
+MERGED_SNAPSHOT = "perf-merged.json"
+
+
+class RequestStats:
+    """Measurements of the request being served in this context."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.render_started = None
+        self.render_seconds = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding query counts and time to the
+    request served in the current context."""
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+class TimedSerializerMixin:
+    """Add the time views spend in ``serializer.data`` to the request.
+
+    Serializers build their data lazily, so the serializer's
+    ``to_representation`` is timed instead of ``get_serializer``.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        stats = current_request.get()
+        if stats is None:
+            return serializer
+        to_representation = serializer.to_representation
+
+        def timed(instance):
+            started = time.perf_counter()
+            try:
+                return to_representation(instance)
+            finally:
+                stats.serialize_seconds += time.perf_counter() - started
+
+        serializer.to_representation = timed
+        return serializer
+
+
+class Histogram:
+    """Bucket counts of observed values, the last bucket is ``+Inf``."""
+
+    def __init__(self, bounds, counts=None, total=0.0):
+        self.bounds = tuple(bounds)
+        self.counts = list(counts or [0] * (len(self.bounds) + 1))
+        self.total = total
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+    def quantile(self, fraction):
+        """Estimate a quantile by interpolating inside its bucket."""
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return 0.0
+
+    def to_dict(self):
+        return {"counts": self.counts, "sum": self.total}
+
+    @classmethod
+    def from_dict(cls, bounds, data):
+        return cls(bounds, data["counts"], data["sum"])
+
+
+class PerfRegistry:
+    """Per view histograms of this process, flushed to a JSON file.
+
+    Every process writes ``perf-<pid>.json`` into ``PERF_METRICS_DIR`` at
+    most every ``PERF_METRICS_FLUSH_INTERVAL`` seconds, so the snapshots of
+    all gunicorn workers can be merged by ``perf_report`` or ``/metrics``.
+    Snapshots of exited processes, e.g. workers recycled after
+    ``max_requests``, are folded into one file so they do not pile up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._flushed_at = time.monotonic()
+
+    def observe(self, view, values):
+        with self._lock:
+            histograms = self._views.get(view)
+            if histograms is None:
+                histograms = self._views[view] = {
+                    name: Histogram(bounds) for name, bounds in METRICS.items()
+                }
+            for name, value in values.items():
+                if value is not None:
+                    histograms[name].observe(value)
+        interval = getattr(settings, "PERF_METRICS_FLUSH_INTERVAL", 30)
+        if time.monotonic() - self._flushed_at >= interval:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: {
+                    name: histogram.to_dict()
+                    for name, histogram in histograms.items()
+                }
+                for view, histograms in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        directory = getattr(settings, "PERF_METRICS_DIR", None)
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        _write_snapshot(
+            os.path.join(directory, f"perf-{os.getpid()}.json"),
+            {"pid": os.getpid(), "views": self.snapshot()},
+        )
+        fold_snapshots(directory)
+
+    def retire(self):
+        """Flush and fold this process's snapshot on exit."""
+        self.flush()
+        directory = getattr(settings, "PERF_METRICS_DIR", None)
+        if directory:
+            fold_snapshots(directory, retired=os.getpid())
+
+
+def _write_snapshot(path, snapshot):
+    with open(f"{path}.tmp", "w") as output:
+        json.dump(snapshot, output)
+    os.replace(f"{path}.tmp", path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge_views(merged, views):
+    for view, metrics in views.items():
+        target = merged.setdefault(view, {})
+        for name, data in metrics.items():
+            if name not in METRICS:
+                continue
+            histogram = Histogram(METRICS[name])
+            if name in target:
+                histogram = Histogram.from_dict(METRICS[name], target[name])
+            histogram.merge(Histogram.from_dict(METRICS[name], data))
+            target[name] = histogram.to_dict()
+
+
+def fold_snapshots(directory, retired=None):
+    """Fold snapshots of exited processes and ``retired`` into
+    ``MERGED_SNAPSHOT`` and remove their files."""
+    with open(os.path.join(directory, "perf.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        folded = []
+        for path in glob.glob(os.path.join(directory, "perf-*.json")):
+            pid = os.path.basename(path)[len("perf-"):-len(".json")]
+            if pid.isdigit() and (int(pid) == retired or not _alive(int(pid))):
+                folded.append(path)
+        if not folded:
+            return
+        merged_path = os.path.join(directory, MERGED_SNAPSHOT)
+        merged = {}
+        for path in [merged_path, *folded]:
+            try:
+                with open(path) as snapshot:
+                    _merge_views(merged, json.load(snapshot)["views"])
+            except (OSError, ValueError, KeyError):
+                continue
+        _write_snapshot(merged_path, {"pid": None, "views": merged})
+        for path in folded:
+            os.remove(path)
+
+
+registry = PerfRegistry()
+atexit.register(registry.retire)
+
+
+def load_snapshots(directory=None):
+    """Merge the flushed snapshots of every process into histograms."""
+    directory = directory or getattr(settings, "PERF_METRICS_DIR", None)
+    merged = {}
+    paths = []
+    if directory:
+        paths = glob.glob(os.path.join(directory, "perf-*.json"))
+    snapshots = []
+    for path in paths:
+        try:
+            with open(path) as snapshot:
+                snapshots.append(json.load(snapshot)["views"])
+        except (OSError, ValueError, KeyError):
+            continue
+    if not paths:
+        snapshots.append(registry.snapshot())
+    for views in snapshots:
+        for view, metrics in views.items():
+            histograms = merged.setdefault(
+                view,
+                {name: Histogram(bounds) for name, bounds in METRICS.items()},
+            )
+            for name, data in metrics.items():
+                if name in METRICS:
+                    histograms[name].merge(
+                        Histogram.from_dict(METRICS[name], data)
+                    )
+    return merged
+
+
+def render_prometheus(views):
+    """Render merged histograms in the Prometheus text format."""
+    lines = []
+    for name in METRICS:
+        metric = f"airport_request_{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        for view, histograms in sorted(views.items()):
+            histogram = histograms[name]
+            label = view.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, bucket_count in zip(
+                (*histogram.bounds, "+Inf"), histogram.counts
+            ):
+                cumulative += bucket_count
+                lines.append(
+                    f'{metric}_bucket{{view="{label}",le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f'{metric}_sum{{view="{label}"}} {histogram.total}')
+            lines.append(f'{metric}_count{{view="{label}"}} {cumulative}')
+    return "\n".join(lines) + "\n"
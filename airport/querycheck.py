@@ -0,0 +1,122 @@
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = re.compile(r"%s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+SKIPPED = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+current_inspector = contextvars.ContextVar("query_inspector", default=None)
+
+
+class QueryCheckError(AssertionError):
+    pass
+
+
+def normalize(sql):
+    """Reduce ``sql`` to its shape: literals, params and IN lists elided."""
+    shape = PLACEHOLDER.sub("?", sql)
+    shape = IN_LIST.sub("(...)", shape)
+    return " ".join(shape.split())
+
+
+class QueryInspector:
+    """Group the queries of one unit of work by shape.
+
+    A shape executed ``QUERY_CHECK_REPEAT_THRESHOLD`` times or more is
+    the N+1 signature; queries slower than ``QUERY_CHECK_SLOW_MS`` and
+    more than ``QUERY_CHECK_MAX_QUERIES`` queries in total are flagged as
+    well. Use it as a context manager around code outside of requests.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.shapes = Counter()
+        self.slow = []
+        self._token = None
+
+    def __enter__(self):
+        self._token = current_inspector.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        current_inspector.reset(self._token)
+
+    def record(self, sql, duration):
+        if sql.lstrip().upper().startswith(SKIPPED):
+            return
+        shape = normalize(sql)
+        self.shapes[shape] += 1
+        if duration * 1000 >= getattr(settings, "QUERY_CHECK_SLOW_MS", 200):
+            self.slow.append((duration, shape))
+
+    def problems(self):
+        threshold = getattr(settings, "QUERY_CHECK_REPEAT_THRESHOLD", 5)
+        max_queries = getattr(settings, "QUERY_CHECK_MAX_QUERIES", None)
+        problems = [
+            f"{count} x {shape}"
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+        total = sum(self.shapes.values())
+        if max_queries is not None and total > max_queries:
+            problems.append(f"{total} queries, at most {max_queries} allowed")
+        return problems
+
+    def check(self):
+        """Log slow queries and log or raise repeated query shapes."""
+        for duration, shape in self.slow:
+            logger.warning(
+                "Slow query in %s (%.0f ms): %s",
+                self.label, duration * 1000, shape,
+            )
+        problems = self.problems()
+        if not problems:
+            return
+        message = f"Repeated queries in {self.label}:\n" + "\n".join(
+            problems
+        )
+        if getattr(settings, "QUERY_CHECK_RAISE", False):
+            raise QueryCheckError(message)
+        logger.warning(message)
+
+
+def inspect_query(execute, sql, params, many, context):
+    """Database execute wrapper feeding the inspector of this context."""
+    inspector = current_inspector.get()
+    if inspector is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        inspector.record(sql, time.perf_counter() - started)
+
+
+class QueryCheckMiddleware:
+    """Inspect the queries of every request when QUERY_CHECK_ENABLED.
+
+    Meant for the test suite, where the test runner turns it on and makes
+    it raise, and for staging, where findings are logged.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_CHECK_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryInspector(f"{request.method} {request.path}") as inspector:
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is not None:
+            inspector.label = f"{match.view_name} ({inspector.label})"
+        inspector.check()
+        return response
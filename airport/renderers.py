@@ -0,0 +1,37 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer serializing with orjson when it is installed.
+
+    Output matches ``JSONRenderer`` with the default compact, unicode
+    settings; datetimes and types orjson doesn't know (Decimal, lazy
+    strings, ...) go through DRF's encoder. Indented output for the
+    browsable API and installs without orjson fall back to
+    ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        if data is None:
+            return b""
+        rendered = orjson.dumps(
+            data,
+            default=JSONEncoder().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Like JSONRenderer, escape separators that are invalid in JS.
+        return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -1,8 +1,19 @@
+import base64
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from airport.booking import create_order, hold_seats
+from airport.caching import bump_version, model_version_name
+from airport.conflicts import Candidate, check_flights
+from airport.itineraries import flight_index
 from airport.models import (
     Airport,
     Airplane,
@@ -12,9 +23,139 @@ from airport.models import (
     Order,
     Flight,
     Crew,
+    SeatHold,
+    SeatInventory,
 )
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolve the pk from objects preloaded by PreloadingListSerializer."""
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get("preloaded", {}).get(self)
+        if preloaded is not None and not isinstance(data, bool):
+            try:
+                pk = self.get_queryset().model._meta.pk.to_python(data)
+            except (TypeError, ValueError, DjangoValidationError):
+                pk = None
+            if pk in preloaded:
+                return preloaded[pk]
+        return super().to_internal_value(data)
+
+
+class PreloadingListSerializer(serializers.ListSerializer):
+    """Fetch related objects of all items with one query per field."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload(data)
+        return super().to_internal_value(data)
+
+    def preload(self, data):
+        preloaded = self.context.setdefault("preloaded", {})
+        for field_name, field in self.child.fields.items():
+            many = isinstance(field, serializers.ManyRelatedField)
+            if many:
+                field = field.child_relation
+            if not isinstance(field, PreloadedPrimaryKeyRelatedField):
+                continue
+            pk_field = field.get_queryset().model._meta.pk
+            pks = set()
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                values = item.get(field_name)
+                if not many or not isinstance(values, list):
+                    values = [values]
+                for value in values:
+                    if value is None or isinstance(value, (bool, dict)):
+                        continue
+                    try:
+                        pks.add(pk_field.to_python(value))
+                    except (TypeError, ValueError, DjangoValidationError):
+                        pass
+            preloaded[field] = field.get_queryset().in_bulk(pks)
+
+
+class BulkCreateListSerializer(PreloadingListSerializer):
+    """Insert all items with one query per table.
+
+    Many-to-many relations are written as bulk inserts into the through
+    table. Model signals do not fire, so the model cache version is bumped
+    here.
+    """
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            instances = self.bulk_create(validated_data)
+        bump_version(model_version_name(self.child.Meta.model))
+        return instances
+
+    def bulk_create(self, validated_data):
+        model = self.child.Meta.model
+        many_fields = [
+            field.source
+            for field in self.child.fields.values()
+            if isinstance(field, serializers.ManyRelatedField)
+            and not field.read_only
+        ]
+        instances = []
+        related = []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            related.append(
+                {name: attrs.pop(name, []) for name in many_fields}
+            )
+            instances.append(model(**attrs))
+        model.objects.bulk_create(instances)
+
+        for name in many_fields:
+            m2m_field = model._meta.get_field(name)
+            through = m2m_field.remote_field.through
+            source = m2m_field.m2m_field_name()
+            target = m2m_field.m2m_reverse_field_name()
+            through.objects.bulk_create(
+                [
+                    through(
+                        **{f"{source}_id": instance.pk,
+                           f"{target}_id": other.pk}
+                    )
+                    for instance, values in zip(instances, related)
+                    for other in set(values[name])
+                ]
+            )
+        if many_fields:
+            prefetch_related_objects(instances, *many_fields)
+        return instances
+
+
+class FlightBulkListSerializer(BulkCreateListSerializer):
+    def to_internal_value(self, data):
+        validated_data = super().to_internal_value(data)
+        conflicts = check_flights(
+            [
+                self.child.schedule_candidate(attrs, item)
+                for item, attrs in enumerate(validated_data)
+            ]
+        )
+        if conflicts:
+            raise ValidationError(
+                [conflicts.get(item, {}) for item in range(len(data))]
+            )
+        return validated_data
+
+    def bulk_create(self, validated_data):
+        flights = super().bulk_create(validated_data)
+        SeatInventory.objects.bulk_create(
+            [
+                SeatInventory.build(flight, taken=(), held=())
+                for flight in flights
+            ]
+        )
+        transaction.on_commit(flight_index.invalidate)
+        return flights
+
+
 class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
@@ -37,6 +178,7 @@ class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
         fields = ("id", "first_name", "last_name", "full_name")
+        list_serializer_class = BulkCreateListSerializer
 
 
 class AirplaneSerializer(serializers.ModelSerializer):
@@ -100,6 +242,13 @@ class RouteDetailSerializer(RouteSerializer):
 
 
 class FlightSerializer(serializers.ModelSerializer):
+    route = PreloadedPrimaryKeyRelatedField(queryset=Route.objects.all())
+    airplane = PreloadedPrimaryKeyRelatedField(
+        queryset=Airplane.objects.all()
+    )
+    crews = PreloadedPrimaryKeyRelatedField(
+        queryset=Crew.objects.all(), many=True, required=False
+    )
     departure_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M")
     arrival_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M")
 
@@ -113,12 +262,42 @@ class FlightSerializer(serializers.ModelSerializer):
             "arrival_time",
             "crews"
         )
+        list_serializer_class = FlightBulkListSerializer
 
     def validate(self, attrs):
-        if attrs["departure_time"] >= attrs["arrival_time"]:
+        if self.updated(attrs, "departure_time") >= self.updated(
+            attrs, "arrival_time"
+        ):
             raise ValidationError("Arrival time must be after departure time.")
+        if not isinstance(self.parent, serializers.ListSerializer):
+            conflicts = check_flights([self.schedule_candidate(attrs)])
+            if conflicts:
+                raise ValidationError(conflicts[0])
         return attrs
 
+    def updated(self, attrs, field):
+        """Value of ``field`` once saved, the instance's for partial
+        updates that leave it out."""
+        if field in attrs:
+            return attrs[field]
+        return getattr(self.instance, field)
+
+    def schedule_candidate(self, attrs, item=0):
+        """Describe the validated flight for the conflict detector."""
+        instance = self.instance
+        airplane = self.updated(attrs, "airplane")
+        crews = attrs.get("crews")
+        if crews is None:
+            crews = instance.crews.all() if instance else []
+        return Candidate(
+            item=item,
+            flight=instance.pk if instance else None,
+            airplane=airplane.pk,
+            crews={crew.pk for crew in crews},
+            departure_time=self.updated(attrs, "departure_time"),
+            arrival_time=self.updated(attrs, "arrival_time"),
+        )
+
 
 class FlightListSerializer(FlightSerializer):
     route = serializers.StringRelatedField()
@@ -140,6 +319,10 @@ class FlightListSerializer(FlightSerializer):
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    flight = PreloadedPrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -153,6 +336,9 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        list_serializer_class = PreloadingListSerializer
+        # Seat uniqueness is checked against the seat inventory when booking
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -165,15 +351,57 @@ class TicketSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
+class SeatMapSerializer(serializers.ModelSerializer):
+    """Occupancy of a flight for clients on slow networks.
+
+    ``bitmap`` is the base64 encoded row-major bitmap of sold or held
+    seats where bit ``(row - 1) * seats_in_row + seat - 1`` is set, lowest
+    bit of each byte first. ``runs`` lists the lengths of alternating
+    free and occupied runs in the same order, starting with free seats.
+    """
+
+    ENCODINGS = ("bitmap", "runs")
+
+    encoding = serializers.SerializerMethodField()
+    occupancy = serializers.SerializerMethodField()
+
+    def get_encoding(self, obj):
+        return self.context.get("encoding", "bitmap")
+
+    @extend_schema_field(serializers.CharField)
+    def get_occupancy(self, obj):
+        if self.get_encoding(obj) == "runs":
+            return obj.occupancy_runs()
+        return base64.b64encode(obj.occupancy()).decode()
+
+    class Meta:
+        model = SeatInventory
+        fields = (
+            "flight",
+            "rows",
+            "seats_in_row",
+            "seats_free",
+            "encoding",
+            "occupancy",
+        )
+
+
 class FlightDetailSerializer(serializers.ModelSerializer):
     route = RouteDetailSerializer()
     airplane = AirplaneDetailSerializer()
     crews = CrewSerializer(many=True)
-    taken_places = TicketSeatsSerializer(
-        source="tickets",
-        many=True,
-        read_only=True
-    )
+    taken_places = serializers.SerializerMethodField()
+
+    @extend_schema_field(TicketSeatsSerializer(many=True))
+    def get_taken_places(self, obj):
+        try:
+            inventory = obj.seat_inventory
+        except SeatInventory.DoesNotExist:
+            inventory = SeatInventory.build(obj)
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in inventory.taken_places()
+        ]
 
     class Meta:
         model = Flight
@@ -196,13 +424,100 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ("id", "tickets", "created_at")
 
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+        tickets_data = validated_data.pop("tickets")
+        return create_order(tickets_data, **validated_data)
 
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "flight", "row", "seat", "expires_at")
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+    ttl = serializers.IntegerField(
+        min_value=1, required=False, help_text="Hold lifetime in seconds"
+    )
+
+    def validate_ttl(self, value):
+        if value > settings.SEAT_HOLD_MAX_TTL:
+            raise ValidationError(
+                f"ttl must not exceed {settings.SEAT_HOLD_MAX_TTL} seconds."
+            )
+        return value
+
+    def create(self, validated_data):
+        return hold_seats(
+            validated_data["user"],
+            validated_data["flight"],
+            [(seat["row"], seat["seat"]) for seat in validated_data["seats"]],
+            validated_data.get("ttl", settings.SEAT_HOLD_TTL),
+        )
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField(help_text="Source airport id")
+    destination = serializers.IntegerField(help_text="Destination airport id")
+    date = serializers.DateField(
+        required=False, help_text="Departure date of the first flight"
+    )
+    departure_from = serializers.DateTimeField(required=False)
+    departure_to = serializers.DateTimeField(required=False)
+    max_connections = serializers.IntegerField(
+        default=2, min_value=0, max_value=3
+    )
+    min_connection = serializers.IntegerField(
+        default=45, min_value=0, help_text="Minimum connection in minutes"
+    )
+    max_connection = serializers.IntegerField(
+        default=24 * 60,
+        min_value=1,
+        help_text="Maximum connection in minutes",
+    )
+    sort = serializers.ChoiceField(
+        choices=("duration", "distance"), default="duration"
+    )
+    limit = serializers.IntegerField(default=20, min_value=1, max_value=100)
+
+    def validate(self, attrs):
+        if "date" in attrs:
+            attrs["departure_from"] = timezone.make_aware(
+                datetime.combine(attrs.pop("date"), time.min)
+            )
+            attrs["departure_to"] = attrs["departure_from"] + timedelta(
+                days=1
+            )
+        elif "departure_from" not in attrs:
+            raise ValidationError(
+                "Provide either date or departure_from."
+            )
+        attrs.setdefault(
+            "departure_to", attrs["departure_from"] + timedelta(days=1)
+        )
+        if attrs["min_connection"] >= attrs["max_connection"]:
+            raise ValidationError(
+                "max_connection must be greater than min_connection."
+            )
+        return attrs
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M")
+    arrival_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M")
+    duration = serializers.IntegerField(help_text="Total minutes")
+    distance = serializers.IntegerField()
+    connections = serializers.IntegerField()
+    flights = FlightListSerializer(many=True)
@@ -0,0 +1,134 @@
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_migrate,
+)
+from django.dispatch import receiver
+
+from airport.booking import releasing_holds
+from airport.caching import (
+    bump_version,
+    flight_version_name,
+    model_version_name,
+)
+from airport.itineraries import flight_index
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+    SeatHold,
+    SeatInventory,
+    Ticket,
+)
+from airport.perf import record_query
+from airport.querycheck import inspect_query
+
+
+# Models named in the cache_models of cached views. Flights, tickets,
+# inventories and holds invalidate through flight versions instead.
+@receiver([post_save, post_delete], sender=Airport)
+@receiver([post_save, post_delete], sender=AirplaneType)
+@receiver([post_save, post_delete], sender=Airplane)
+@receiver([post_save, post_delete], sender=Crew)
+@receiver([post_save, post_delete], sender=Route)
+def bump_airport_model_version(sender, **kwargs):
+    bump_version(model_version_name(sender))
+
+
+@receiver([post_save, post_delete], sender=Flight)
+def bump_flight_version(sender, instance, **kwargs):
+    bump_version(flight_version_name(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+@receiver([post_save, post_delete], sender=SeatInventory)
+def bump_seat_flight_version(sender, instance, **kwargs):
+    bump_version(flight_version_name(instance.flight_id))
+
+
+@receiver(m2m_changed, sender=Flight.crews.through)
+def bump_crewed_flight_version(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    if not reverse:
+        flight_ids = [instance.pk] if action.startswith("post_") else []
+    elif action == "pre_clear":
+        flight_ids = instance.flights.values_list("pk", flat=True)
+    elif action in ("post_add", "post_remove"):
+        flight_ids = pk_set
+    else:
+        flight_ids = []
+    for flight_id in flight_ids:
+        bump_version(flight_version_name(flight_id))
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    inventory = (
+        SeatInventory.objects.select_for_update()
+        .filter(flight_id=instance.flight_id)
+        .first()
+    )
+    if inventory is not None:
+        inventory.release([(instance.row, instance.seat)])
+        inventory.save(update_fields=SeatInventory.STATE_FIELDS)
+
+
+@receiver(post_delete, sender=SeatHold)
+def release_deleted_hold(sender, instance, **kwargs):
+    """Clear the hold bit of holds deleted outside of booking.
+
+    Covers bulk deletes and cascades from users and flights, booking
+    clears the bits of the holds it deletes under its own locks.
+    """
+    if releasing_holds.get():
+        return
+    inventory = (
+        SeatInventory.objects.select_for_update()
+        .filter(flight_id=instance.flight_id)
+        .first()
+    )
+    if inventory is not None:
+        inventory.unhold([(instance.row, instance.seat)])
+        inventory.save(update_fields=SeatInventory.STATE_FIELDS)
+
+
+@receiver(post_save, sender=Flight)
+def index_saved_flight(sender, instance, **kwargs):
+    transaction.on_commit(lambda: flight_index.flight_saved(instance))
+
+
+@receiver(post_delete, sender=Flight)
+def unindex_deleted_flight(sender, instance, **kwargs):
+    flight_id = instance.id
+    transaction.on_commit(lambda: flight_index.flight_deleted(flight_id))
+
+
+@receiver(post_save, sender=Route)
+def reindex_saved_route(sender, instance, **kwargs):
+    transaction.on_commit(lambda: flight_index.route_saved(instance))
+
+
+@receiver(pre_migrate)
+def lift_statement_timeout(sender, using, **kwargs):
+    """Let migrations run past ``DB_STATEMENT_TIMEOUT_MS``.
+
+    The timeout guards requests, a backfill of a large table may take
+    longer. Only the session of the migrate command is affected.
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET statement_timeout = 0")
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    for wrapper in (record_query, inspect_query):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
@@ -0,0 +1,17 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryCheckTestRunner(DiscoverRunner):
+    """Run the tests with repeated query shapes failing the request."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.query_check = override_settings(
+            QUERY_CHECK_ENABLED=True, QUERY_CHECK_RAISE=True
+        )
+        self.query_check.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.query_check.disable()
+        super().teardown_test_environment(**kwargs)
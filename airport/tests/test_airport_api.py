@@ -92,7 +92,7 @@ class AuthenticatedAirplaneApiTests(TestCase):
         serializer = AirplaneListSerializer(airplanes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_airplanes_by_type(self):
         airplane_type = sample_airplane_type(name="Airbus")
@@ -104,8 +104,8 @@ class AuthenticatedAirplaneApiTests(TestCase):
         serializer1 = AirplaneListSerializer(airplane1)
         serializer2 = AirplaneListSerializer(airplane2)
 
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer1.data, res.data)
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer1.data, res.data["results"])
 
     def test_filter_airplanes_by_name(self):
         airplane1 = sample_airplane(name="Boeing 747")
@@ -116,8 +116,8 @@ class AuthenticatedAirplaneApiTests(TestCase):
         serializer1 = AirplaneListSerializer(airplane1)
         serializer2 = AirplaneListSerializer(airplane2)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
 
 class AuthenticatedFlightApiTests(TestCase):
@@ -143,7 +143,7 @@ class AuthenticatedFlightApiTests(TestCase):
             flight['tickets_available'] = 180  # 30 rows * 6 seats_in_row = 180
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, expected_data)
+        self.assertEqual(res.data["results"], expected_data)
 
     def test_filter_flights_by_route(self):
         route1 = sample_route()
@@ -157,7 +157,7 @@ class AuthenticatedFlightApiTests(TestCase):
         serializer1_data = serializer1.data
         serializer1_data['tickets_available'] = 180
 
-        self.assertIn(serializer1_data, res.data)
+        self.assertIn(serializer1_data, res.data["results"])
 
     def test_filter_flights_by_airplane(self):
         airplane1 = sample_airplane()
@@ -171,7 +171,7 @@ class AuthenticatedFlightApiTests(TestCase):
         serializer1_data = serializer1.data
         serializer1_data['tickets_available'] = 180
 
-        self.assertIn(serializer1_data, res.data)
+        self.assertIn(serializer1_data, res.data["results"])
 
     def test_filter_flights_by_departure_time(self):
         flight1 = sample_flight(departure_time=datetime(2024, 6, 11, 10, 0))
@@ -183,4 +183,42 @@ class AuthenticatedFlightApiTests(TestCase):
         serializer1_data = serializer1.data
         serializer1_data['tickets_available'] = 180
 
-        self.assertIn(serializer1_data, res.data)
+        self.assertIn(serializer1_data, res.data["results"])
+
+    def test_flights_paginated_by_departure_time(self):
+        flights = [
+            sample_flight(departure_time=datetime(2024, 6, day, 10, 0))
+            for day in (3, 1, 2, 1)
+        ]
+
+        res = self.client.get(FLIGHT_URL, {"page_size": 2})
+        first_page = [flight["id"] for flight in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        second_page = [flight["id"] for flight in res.data["results"]]
+
+        self.assertEqual(
+            first_page + second_page,
+            [flights[1].id, flights[3].id, flights[2].id, flights[0].id],
+        )
+        self.assertIsNone(res.data["next"])
+
+    def test_filter_flights_by_departure_range(self):
+        flight1 = sample_flight(departure_time=datetime(2024, 6, 11, 7, 0))
+        flight2 = sample_flight(departure_time=datetime(2024, 6, 11, 12, 0))
+        flight3 = sample_flight(departure_time=datetime(2024, 6, 12, 12, 0))
+
+        res = self.client.get(
+            FLIGHT_URL,
+            {
+                "departure_from": "2024-06-11T10:00:00+02:00",
+                "departure_to": "2024-06-12",
+            },
+        )
+
+        ids = [flight["id"] for flight in res.data["results"]]
+        self.assertEqual(ids, [flight2.id])
+
+    def test_filter_flights_by_invalid_departure_time(self):
+        res = self.client.get(FLIGHT_URL, {"departure_time": "11.06.2024"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
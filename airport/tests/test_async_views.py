@@ -0,0 +1,37 @@
+from django.test import AsyncRequestFactory, TransactionTestCase
+
+from airport.async_views import async_read_view
+from airport.tests.test_airport_api import sample_flight
+from airport.views import FlightViewSet
+
+
+class AsyncReadViewTests(TransactionTestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.flight = sample_flight()
+
+    async def test_list_served_from_worker_thread(self):
+        view = async_read_view(FlightViewSet, {"get": "list"})
+
+        response = await view(self.factory.get("/api/airport/flights/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"tickets_available":180', response.content)
+
+    async def test_retrieve_and_write_methods(self):
+        view = async_read_view(
+            FlightViewSet, {"get": "retrieve", "delete": "destroy"}
+        )
+
+        response = await view(
+            self.factory.get(f"/api/airport/flights/{self.flight.id}/"),
+            pk=self.flight.id,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+        response = await view(
+            self.factory.delete(f"/api/airport/flights/{self.flight.id}/"),
+            pk=self.flight.id,
+        )
+        self.assertEqual(response.status_code, 204)
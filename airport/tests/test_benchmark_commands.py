@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport.models import Flight, Ticket
+
+
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        call_command(
+            "seed_benchmark_data",
+            airports=5,
+            routes=10,
+            airplanes=3,
+            flights=30,
+            users=3,
+            orders=20,
+            stdout=StringIO(),
+        )
+
+    def test_seeded_data_is_consistent(self):
+        self.assertEqual(Flight.objects.count(), 30)
+        self.assertEqual(Ticket.objects.count(), 40)
+        call_command("rebuild_seat_inventory", verify=True, stdout=StringIO())
+        call_command("check_schedule", stdout=StringIO())
+
+    def test_api_benchmark_writes_results(self):
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        call_command(
+            "api_benchmark",
+            requests=3,
+            scenarios=["flights_list", "orders_create"],
+            output=path,
+            stdout=StringIO(),
+        )
+
+        with open(path) as results_file:
+            results = json.load(results_file)["scenarios"]
+        self.assertEqual(results["flights_list"]["status"], {"200": 3})
+        self.assertEqual(results["orders_create"]["status"], {"201": 3})
+        self.assertGreater(results["flights_list"]["queries_per_request"], 0)
+        self.assertEqual(Ticket.objects.count(), 43)
+
+    def test_password_benchmark(self):
+        out = StringIO()
+
+        call_command(
+            "password_benchmark", hashers=["pbkdf2_sha256"], hashes=2,
+            stdout=out,
+        )
+
+        self.assertIn("pbkdf2_sha256", out.getvalue())
@@ -0,0 +1,147 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, OperationalError, connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import booking
+from airport.booking import SeatsUnavailable, create_order
+from airport.models import Order, Ticket
+from airport.tests.test_airport_api import sample_flight
+
+ORDER_URL = reverse("airport:order-list")
+# Postgres bookings also set a transaction-local lock_timeout
+BOOKING_QUERIES = 8 + (connection.vendor == "postgresql")
+
+
+class BookingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def order(self, places, flight=None):
+        flight = flight or self.flight
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.id}
+                    for row, seat in places
+                ]
+            },
+            format="json",
+        )
+
+    def test_group_booking_query_count_is_constant(self):
+        with self.assertNumQueries(BOOKING_QUERIES):
+            res = self.order([(1, 1)])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(BOOKING_QUERIES):
+            res = self.order(
+                [(row, seat) for row in range(2, 12) for seat in range(1, 7)]
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.count(), 61)
+
+    def test_taken_seat_rejected(self):
+        self.order([(1, 1)])
+
+        res = self.order([(1, 2), (1, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"flight": self.flight.id, "row": 1, "seat": 1}],
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_duplicate_seat_in_request_rejected(self):
+        res = self.order([(2, 2), (2, 2)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_seat_out_of_range_rejected(self):
+        res = self.order([(31, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row", res.data["tickets"][0])
+
+
+class BookingRetryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.flight = sample_flight()
+
+    def test_constraint_race_rejected_without_retry(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            [Ticket(row=3, seat=3, flight=self.flight, order=order)]
+        )
+        calls = []
+        book_tickets = booking.book_tickets
+
+        def counting_book_tickets(order, tickets_data):
+            calls.append(order)
+            return book_tickets(order, tickets_data)
+
+        with mock.patch.object(booking, "book_tickets", counting_book_tickets):
+            with self.assertRaises(SeatsUnavailable) as raised:
+                create_order(
+                    [{"row": 3, "seat": 3, "flight": self.flight}],
+                    user=self.user,
+                )
+
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertEqual(
+            raised.exception.seats,
+            [{"flight": self.flight.id, "row": 3, "seat": 3}],
+        )
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    @override_settings(BOOKING_RETRY_BACKOFF=0)
+    def test_serialization_failure_retried(self):
+        book_tickets = booking.book_tickets
+        calls = []
+
+        def flaky_book_tickets(order, tickets_data):
+            calls.append(order)
+            if len(calls) == 1:
+                cause = Exception("could not serialize access")
+                cause.pgcode = "40001"
+                raise OperationalError(*cause.args) from cause
+            return book_tickets(order, tickets_data)
+
+        with mock.patch.object(booking, "book_tickets", flaky_book_tickets):
+            order = create_order(
+                [{"row": 4, "seat": 4, "flight": self.flight}],
+                user=self.user,
+            )
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(list(Order.objects.all()), [order])
+        self.assertEqual(order.tickets.count(), 1)
+
+    def test_other_integrity_errors_not_retried(self):
+        def failing_book_tickets(order, tickets_data):
+            raise IntegrityError("not null violation")
+
+        with mock.patch.object(booking, "book_tickets", failing_book_tickets):
+            with self.assertRaises(IntegrityError):
+                create_order(
+                    [{"row": 5, "seat": 5, "flight": self.flight}],
+                    user=self.user,
+                )
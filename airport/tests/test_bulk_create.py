@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight, SeatInventory
+from airport.tests.test_airport_api import sample_airplane, sample_route
+
+FLIGHT_BULK_URL = reverse("airport:flight-bulk")
+CREW_BULK_URL = reverse("airport:crew-bulk")
+
+
+class BulkCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.airplane = sample_airplane()
+        self.crews = [
+            Crew.objects.create(first_name="Anna", last_name=f"Pilot {i}")
+            for i in range(3)
+        ]
+
+    def flight_payload(self, day, **params):
+        payload = {
+            "route": self.route.id,
+            "airplane": self.airplane.id,
+            "departure_time": f"2024-06-{day:02d}T10:00",
+            "arrival_time": f"2024-06-{day:02d}T14:00",
+            "crews": [crew.id for crew in self.crews],
+        }
+        payload.update(params)
+        return payload
+
+    def test_bulk_create_flights(self):
+        payload = [self.flight_payload(day) for day in range(1, 21)]
+
+        with self.assertNumQueries(11):
+            res = self.client.post(FLIGHT_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 20)
+        self.assertEqual(
+            sorted(res.data[0]["crews"]), [crew.id for crew in self.crews]
+        )
+        self.assertEqual(Flight.crews.through.objects.count(), 60)
+        self.assertEqual(
+            SeatInventory.objects.filter(seats_free=180).count(), 20
+        )
+
+    def test_bulk_create_flights_reports_errors_per_item(self):
+        payload = [
+            self.flight_payload(1),
+            self.flight_payload(2, route=999),
+            self.flight_payload(3, arrival_time="2024-06-03T09:00"),
+        ]
+
+        res = self.client.post(FLIGHT_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("route", res.data[1])
+        self.assertIn("non_field_errors", res.data[2])
+        self.assertFalse(Flight.objects.exists())
+
+    def test_bulk_create_crews(self):
+        payload = [
+            {"first_name": "Ivan", "last_name": f"Navigator {i}"}
+            for i in range(5)
+        ]
+
+        with self.assertNumQueries(3):
+            res = self.client.post(CREW_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data[4]["full_name"], "Ivan Navigator 4")
+        self.assertEqual(Crew.objects.count(), 8)
+
+    def test_bulk_create_limit(self):
+        with self.settings(BULK_CREATE_MAX_ITEMS=2):
+            res = self.client.post(
+                CREW_BULK_URL,
+                [{"first_name": "Ivan", "last_name": "Navigator"}] * 3,
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
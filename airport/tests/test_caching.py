@@ -0,0 +1,164 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.caching import VERSION_KEY, model_version_name
+from airport.checks import check_shared_cache
+from airport.models import Crew, Order, SeatInventory, Ticket
+from airport.tests.test_airport_api import (
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+)
+
+AIRPORT_URL = reverse("airport:airport-list")
+AIRPLANE_URL = reverse("airport:airplane-list")
+
+
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_served_from_cache(self):
+        sample_airport()
+        first = self.client.get(AIRPORT_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_not_modified_for_current_etag(self):
+        sample_airport()
+        etag = self.client.get(AIRPORT_URL)["ETag"]
+
+        res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_save_invalidates_cache(self):
+        sample_airport()
+        etag = self.client.get(AIRPORT_URL)["ETag"]
+
+        sample_airport(name="Another Airport")
+        res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_related_model_change_invalidates_cache(self):
+        airplane = sample_airplane()
+        self.client.get(AIRPLANE_URL)
+
+        airplane.airplane_type.name = "Airbus"
+        airplane.airplane_type.save()
+        res = self.client.get(AIRPLANE_URL)
+
+        self.assertEqual(res.data["results"][0]["airplane_type"], "Airbus")
+
+
+class FlightDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.url = reverse("airport:flight-detail", args=[self.flight.id])
+
+    def test_detail_served_from_cache(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_booking_changes_version(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 2, "seat": 3, "flight": self.flight.id}]},
+            format="json",
+        )
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["taken_places"], [{"row": 2, "seat": 3}])
+
+    def test_crew_change_changes_version(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.flight.crews.add(
+            Crew.objects.create(first_name="Ann", last_name="Lee")
+        )
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["crews"]), 1)
+
+    def test_other_flight_booking_keeps_version(self):
+        other = sample_flight()
+        etag = self.client.get(self.url)["ETag"]
+
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 1, "seat": 1, "flight": other.id}]},
+            format="json",
+        )
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_booking_bumps_no_model_versions(self):
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+
+        for model in (Order, Ticket, SeatInventory):
+            self.assertIsNone(
+                cache.get(VERSION_KEY.format(model_version_name(model)))
+            )
+
+
+class SharedCacheCheckTests(TestCase):
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_process_local_cache_warns(self):
+        self.assertEqual(
+            [warning.id for warning in check_shared_cache(None)],
+            ["airport.W001"],
+        )
+
+    @override_settings(
+        WEB_CONCURRENCY=4,
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "airport_cache",
+            }
+        },
+    )
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    def test_single_worker_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,119 @@
+import gzip
+from datetime import datetime
+from decimal import Decimal
+from io import StringIO
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport.compression import CompressionMiddleware, accepted_encoding
+from airport.renderers import ORJSONRenderer
+from airport.tests.test_airport_api import FLIGHT_URL, sample_flight
+
+
+class ORJSONRendererTests(TestCase):
+    def test_output_matches_json_renderer(self):
+        data = {
+            "id": 1,
+            "price": Decimal("12.50"),
+            "departure": timezone.make_aware(datetime(2024, 5, 1, 10, 30)),
+            "city": "Kyiv   Львів",
+            "tickets": [{"row": 1, "seat": None}, {"row": 2, "seat": 3.5}],
+            4: "non string key",
+        }
+
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indented_output_falls_back(self):
+        rendered = ORJSONRenderer().render(
+            {"id": 1}, "application/json; indent=2"
+        )
+
+        self.assertEqual(rendered, b'{\n  "id": 1\n}')
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.flights = [sample_flight() for _ in range(20)]
+
+    def test_accepted_encoding(self):
+        self.assertEqual(accepted_encoding("gzip, deflate", ("gzip",)), "gzip")
+        self.assertEqual(accepted_encoding("*", ("gzip",)), "gzip")
+        self.assertIsNone(accepted_encoding("gzip;q=0", ("gzip",)))
+        self.assertIsNone(accepted_encoding("deflate", ("gzip",)))
+        self.assertIsNone(accepted_encoding("", ("gzip",)))
+
+    def test_large_response_is_gzipped(self):
+        plain = self.client.get(FLIGHT_URL)
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertEqual(int(res["Content-Length"]), len(res.content))
+
+    @override_settings(COMPRESSION_MIN_SIZE=100000)
+    def test_small_response_is_not_compressed(self):
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", res)
+
+    def test_etag_stays_valid(self):
+        url = reverse("airport:flight-detail", args=[self.flights[0].pk])
+        with override_settings(COMPRESSION_MIN_SIZE=0):
+            res = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertTrue(res["ETag"].startswith('W/"'))
+
+            res = self.client.get(
+                url,
+                HTTP_ACCEPT_ENCODING="gzip",
+                HTTP_IF_NONE_MATCH=res["ETag"],
+            )
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_streaming_export_is_gzipped(self):
+        url = reverse("airport:export-detail", args=["flights"])
+        res = self.client.get(url, HTTP_ACCEPT_ENCODING="br, gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(res.streaming_content))
+        self.assertEqual(len(content.splitlines()), 21)
+
+    async def test_async_chain(self):
+        content = b'{"id": 1}' * 500
+
+        async def get_response(request):
+            return HttpResponse(content, content_type="application/json")
+
+        middleware = CompressionMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        res = await middleware(
+            AsyncRequestFactory().get("/", ACCEPT_ENCODING="gzip")
+        )
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), content)
+
+    def test_render_benchmark(self):
+        out = StringIO()
+
+        call_command("render_benchmark", rows=20, repeat=1, stdout=out)
+
+        self.assertIn("orjson", out.getvalue())
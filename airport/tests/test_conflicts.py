@@ -0,0 +1,153 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight
+from airport.tests.test_airport_api import sample_airplane, sample_route
+
+FLIGHT_URL = reverse("airport:flight-list")
+FLIGHT_BULK_URL = reverse("airport:flight-bulk")
+
+
+def at(hour):
+    return timezone.make_aware(datetime(2024, 6, 11, hour, 0))
+
+
+class ScheduleConflictTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.airplane = sample_airplane()
+        self.crew = Crew.objects.create(first_name="Anna", last_name="Pilot")
+        self.flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=at(10),
+            arrival_time=at(14),
+        )
+        self.flight.crews.add(self.crew)
+
+    def payload(self, departure, arrival, **params):
+        payload = {
+            "route": self.route.id,
+            "airplane": sample_airplane(name="Spare").id,
+            "departure_time": f"2024-06-11T{departure:02d}:00",
+            "arrival_time": f"2024-06-11T{arrival:02d}:00",
+        }
+        payload.update(params)
+        return payload
+
+    def test_overlapping_airplane_rejected(self):
+        res = self.client.post(
+            FLIGHT_URL,
+            self.payload(13, 16, airplane=self.airplane.id),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(f"flight {self.flight.id}", res.data["airplane"][0])
+
+    def test_overlapping_crew_rejected(self):
+        res = self.client.post(
+            FLIGHT_URL, self.payload(9, 11, crews=[self.crew.id]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crews", res.data)
+
+    def test_back_to_back_flights_allowed(self):
+        res = self.client.post(
+            FLIGHT_URL,
+            self.payload(
+                14, 16, airplane=self.airplane.id, crews=[self.crew.id]
+            ),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_does_not_conflict_with_itself(self):
+        res = self.client.put(
+            reverse("airport:flight-detail", args=[self.flight.id]),
+            self.payload(
+                11, 15, airplane=self.airplane.id, crews=[self.crew.id]
+            ),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_partial_update_checked_against_saved_times(self):
+        other = Flight.objects.create(
+            route=self.route,
+            airplane=sample_airplane(name="Other"),
+            departure_time=at(12),
+            arrival_time=at(16),
+        )
+        url = reverse("airport:flight-detail", args=[other.id])
+
+        res = self.client.patch(url, {"crews": [self.crew.id]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crews", res.data)
+
+        res = self.client.patch(
+            url, {"arrival_time": "2024-06-11T11:00"}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.patch(
+            url, {"departure_time": "2024-06-11T14:00"}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_bulk_items_conflicting_with_each_other(self):
+        airplane = sample_airplane(name="Other")
+        res = self.client.post(
+            FLIGHT_BULK_URL,
+            [
+                self.payload(15, 18, airplane=airplane.id),
+                self.payload(20, 22, airplane=airplane.id),
+                self.payload(17, 19, airplane=airplane.id),
+            ],
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("item 2 of this request", res.data[0]["airplane"][0])
+        self.assertEqual(res.data[1], {})
+        self.assertIn("item 0 of this request", res.data[2]["airplane"][0])
+
+    def test_check_schedule_command(self):
+        call_command("check_schedule", stdout=StringIO())
+
+        overlapping = Flight.objects.create(
+            route=self.route,
+            airplane=sample_airplane(name="Other"),
+            departure_time=at(12),
+            arrival_time=at(16),
+        )
+        overlapping.crews.add(self.crew)
+        out = StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command("check_schedule", stdout=out)
+
+        self.assertIn(
+            f"Crew {self.crew.id}: flight {self.flight.id} overlaps "
+            f"flight {overlapping.id}",
+            out.getvalue(),
+        )
+        call_command("check_schedule", "--from", "2024-06-12", stdout=out)
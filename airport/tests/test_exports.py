@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.tests.test_airport_api import sample_flight
+
+
+def export_url(dataset):
+    return reverse("airport:export-detail", args=[dataset])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=self.order
+            )
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "testpass")
+        )
+
+        res = self.client.get(export_url("tickets"))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_tickets_csv(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(export_url("tickets"))
+            content = b"".join(res.streaming_content).decode()
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ["id", "order", "flight", "row", "seat"])
+        self.assertEqual(
+            [row[3:] for row in rows[1:]], [["1", "1"], ["1", "2"]]
+        )
+
+    def test_export_flights_ndjson(self):
+        res = self.client.get(export_url("flights"), {"output": "ndjson"})
+        lines = b"".join(res.streaming_content).decode().splitlines()
+
+        flight = json.loads(lines[0])
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(flight["id"], self.flight.id)
+        self.assertEqual(flight["tickets_available"], 178)
+        self.assertEqual(flight["departure_time"], "2024-06-11T10:00:00+00:00")
+
+    def test_export_unknown_format(self):
+        res = self.client.get(export_url("orders"), {"output": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        out = StringIO()
+
+        call_command("export_airport_data", "orders", chunk_size=1, stdout=out)
+
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(rows[0], ["id", "user", "email", "created_at"])
+        self.assertEqual(
+            rows[1][:3],
+            [str(self.order.id), str(self.user.id), "admin@test.com"],
+        )
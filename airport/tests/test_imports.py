@@ -0,0 +1,93 @@
+import os
+import tempfile
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase
+from django.utils import timezone
+
+from airport.imports import ScheduleImporter
+from airport.models import Airport, Flight, Route, SeatInventory
+from airport.tests.test_airport_api import sample_airplane
+
+SCHEDULE = (
+    "source,destination,distance,airplane,departure_time,arrival_time\n"
+    "Kyiv,Lviv,540,Boeing,2024-06-11T10:00,2024-06-11T11:30\n"
+    "Kyiv,Lviv,,Boeing,2024-06-12T10:00,2024-06-12T11:30\n"
+    "Kyiv,Lviv,,Boeing,2024-06-13T10:00,2024-06-13T09:00\n"
+    "Lviv,Kyiv,,Boeing,2024-06-13T10:00,2024-06-13T11:30\n"
+    "Kyiv,Lviv,,Airbus,2024-06-14T10:00,2024-06-14T11:30\n"
+)
+
+
+class ImportScheduleTests(TestCase):
+    def setUp(self):
+        self.airplane = sample_airplane(name="Boeing")
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as schedule:
+            schedule.write(SCHEDULE)
+        self.addCleanup(os.remove, self.path)
+
+    def import_schedule(self):
+        out, err = StringIO(), StringIO()
+        call_command("import_schedule", self.path, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_creates_airports_routes_and_flights(self):
+        out, err = self.import_schedule()
+
+        self.assertIn("2 flights created, 0 updated, 3 rows skipped", out)
+        self.assertIn("Row 3: Arrival time must be after", err)
+        self.assertIn("Row 4: A distance is required", err)
+        self.assertIn("Row 5: Unknown airplane: Airbus", err)
+        self.assertEqual(
+            set(Airport.objects.values_list("name", flat=True)),
+            {"Kyiv", "Lviv"},
+        )
+        route = Route.objects.get()
+        self.assertEqual(route.distance, 540)
+        self.assertEqual(
+            SeatInventory.objects.filter(
+                flight__route=route, seats_free=180
+            ).count(),
+            2,
+        )
+
+    def test_import_updates_matching_flights(self):
+        self.import_schedule()
+        flight = Flight.objects.order_by("departure_time").first()
+        Flight.objects.filter(pk=flight.pk).update(
+            arrival_time=timezone.make_aware(datetime(2024, 6, 11, 12, 0))
+        )
+
+        out, _ = self.import_schedule()
+
+        self.assertIn("0 flights created, 1 updated", out)
+        flight.refresh_from_db()
+        self.assertEqual(
+            flight.arrival_time,
+            timezone.make_aware(datetime(2024, 6, 11, 11, 30)),
+        )
+
+    def test_failed_chunk_leaves_no_airports_or_routes(self):
+        with mock.patch.object(
+            ScheduleImporter, "_save", side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                self.import_schedule()
+
+        self.assertFalse(Airport.objects.exists())
+        self.assertFalse(Route.objects.exists())
+
+    def test_shared_airport_name_skipped(self):
+        Airport.objects.create(name="Lviv", closest_big_city="Lviv")
+        Airport.objects.create(name="Lviv", closest_big_city="Ukraine")
+
+        out, err = self.import_schedule()
+
+        self.assertIn("0 flights created, 0 updated, 5 rows skipped", out)
+        self.assertIn("Row 1: Several airports share", err)
+        self.assertEqual(Airport.objects.filter(name="Lviv").count(), 2)
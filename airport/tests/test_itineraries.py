@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.itineraries import flight_index
+from airport.models import Flight, Route
+from airport.tests.test_airport_api import sample_airplane, sample_airport
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+class ItinerarySearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        flight_index.invalidate()
+
+        self.airplane = sample_airplane()
+        self.kyiv = sample_airport(name="Boryspil")
+        self.warsaw = sample_airport(name="Chopin")
+        self.london = sample_airport(name="Heathrow")
+        self.day = (timezone.now() + timedelta(days=7)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+    def add_flight(self, source, destination, distance, departs, hours):
+        route, _ = Route.objects.get_or_create(
+            source=source, destination=destination, distance=distance
+        )
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=self.day + departs,
+            arrival_time=self.day + departs + timedelta(hours=hours),
+        )
+
+    def search(self, **params):
+        params.setdefault("source", self.kyiv.id)
+        params.setdefault("destination", self.london.id)
+        params.setdefault("date", self.day.date().isoformat())
+        return self.client.get(ITINERARY_URL, params)
+
+    def test_connecting_flights_ranked_by_duration(self):
+        direct = self.add_flight(
+            self.kyiv, self.london, 2400, timedelta(hours=6), 3
+        )
+        first = self.add_flight(
+            self.kyiv, self.warsaw, 700, timedelta(hours=8), 1
+        )
+        second = self.add_flight(
+            self.warsaw, self.london, 1450, timedelta(hours=10), 2
+        )
+
+        res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                [flight["id"] for flight in itinerary["flights"]]
+                for itinerary in res.data
+            ],
+            [[direct.id], [first.id, second.id]],
+        )
+        self.assertEqual(res.data[1]["duration"], 240)
+        self.assertEqual(res.data[1]["connections"], 1)
+
+        res = self.search(sort="distance")
+        self.assertEqual(res.data[0]["distance"], 2150)
+
+    def test_short_connection_skipped(self):
+        self.add_flight(self.kyiv, self.warsaw, 700, timedelta(hours=8), 1)
+        self.add_flight(
+            self.warsaw, self.london, 1450, timedelta(hours=9, minutes=30), 2
+        )
+
+        res = self.search(min_connection=45)
+
+        self.assertEqual(res.data, [])
+
+    def test_index_follows_new_flights(self):
+        self.assertEqual(self.search().data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight = self.add_flight(
+                self.kyiv, self.london, 2400, timedelta(hours=6), 4
+            )
+
+        res = self.search()
+        self.assertEqual(res.data[0]["flights"][0]["id"], flight.id)
+
+    def test_date_or_departure_from_required(self):
+        res = self.client.get(
+            ITINERARY_URL,
+            {"source": self.kyiv.id, "destination": self.london.id},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_limit_keeps_best_itineraries(self):
+        self.add_flight(self.kyiv, self.warsaw, 700, timedelta(hours=8), 1)
+        self.add_flight(
+            self.warsaw, self.london, 1450, timedelta(hours=10), 2
+        )
+        direct = self.add_flight(
+            self.kyiv, self.london, 2400, timedelta(hours=6), 3
+        )
+
+        res = self.search(limit=1)
+
+        self.assertEqual(
+            [flight["id"] for flight in res.data[0]["flights"]], [direct.id]
+        )
+        self.assertEqual(len(res.data), 1)
+
+    @override_settings(ITINERARY_MAX_EXPANSIONS=1)
+    def test_search_explores_bounded_number_of_chains(self):
+        self.add_flight(self.kyiv, self.warsaw, 700, timedelta(hours=8), 1)
+        self.add_flight(
+            self.warsaw, self.london, 1450, timedelta(hours=10), 2
+        )
+
+        self.assertEqual(self.search().data, [])
+
+    def test_authentication_required(self):
+        self.client.force_authenticate(None)
+
+        res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
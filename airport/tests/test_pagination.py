@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order
+from airport.tests.test_airport_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, params, link):
+        res = self.client.get(url, params)
+        pages = [[item["id"] for item in res.data["results"]]]
+        while res.data[link]:
+            res = self.client.get(res.data[link])
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append([item["id"] for item in res.data["results"]])
+        return pages, res
+
+    def test_orders_with_equal_created_at(self):
+        orders = Order.objects.bulk_create(
+            [Order(user=self.user) for _ in range(25)]
+        )
+        Order.objects.update(created_at=timezone.now())
+
+        pages, last = self.walk(ORDER_URL, {"page_size": 10}, "next")
+
+        expected = sorted((order.id for order in orders), reverse=True)
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+
+        res = self.client.get(last.data["previous"])
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], pages[1]
+        )
+
+    def test_flights_with_equal_departure_time(self):
+        flights = [sample_flight() for _ in range(7)]
+
+        pages, _ = self.walk(FLIGHT_URL, {"page_size": 3}, "next")
+
+        self.assertEqual(sum(pages, []), [flight.id for flight in flights])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(ORDER_URL, {"cursor": "cD1bMV0="})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    force_authenticate,
+)
+
+from airport.middleware import PerfMiddleware
+from airport.perf import (
+    MERGED_SNAPSHOT,
+    TIME_BUCKETS,
+    Histogram,
+    current_request,
+    load_snapshots,
+    registry,
+)
+from airport.tests.test_airport_api import sample_flight
+from airport.views import metrics
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class PerfMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        sample_flight()
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_records_view_action_metrics(self):
+        res = self.client.get(FLIGHT_URL)
+
+        metrics = registry.snapshot()["FlightViewSet.list"]
+        self.assertEqual(metrics["wall_seconds"]["counts"][-1], 0)
+        self.assertEqual(metrics["db_queries"]["sum"], 1)
+        self.assertEqual(metrics["response_bytes"]["sum"], len(res.content))
+        self.assertGreater(metrics["serialize_seconds"]["sum"], 0)
+        self.assertGreater(metrics["render_seconds"]["sum"], 0)
+
+    async def test_async_requests_stay_async(self):
+        async def get_response(request):
+            current_request.get().view = "async"
+            return HttpResponse(b"ok")
+
+        middleware = PerfMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        await middleware(AsyncRequestFactory().get("/"))
+
+        metrics = registry.snapshot()["async"]
+        self.assertEqual(metrics["response_bytes"]["sum"], 2)
+
+    def test_perf_report(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for _ in range(3):
+            self.client.get(FLIGHT_URL)
+        self.client.get(reverse("airport:flight-detail", args=[999]))
+
+        with override_settings(PERF_METRICS_DIR=directory):
+            registry.flush()
+            out = StringIO()
+            call_command("perf_report", sort="count", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[1].startswith("FlightViewSet.list"))
+        self.assertEqual(lines[1].split()[1], "3")
+        self.assertTrue(lines[2].startswith("FlightViewSet.retrieve"))
+
+    def test_metrics_endpoint_admin_only(self):
+        self.client.get(FLIGHT_URL)
+        factory = APIRequestFactory()
+
+        request = factory.get("/api/airport/metrics/")
+        force_authenticate(request, self.user)
+        self.assertEqual(metrics(request).status_code, 403)
+
+        self.user.is_staff = True
+        request = factory.get("/api/airport/metrics/")
+        force_authenticate(request, self.user)
+        res = metrics(request)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(
+            b"airport_request_serialize_seconds_count"
+            b'{view="FlightViewSet.list"} 1',
+            res.content,
+        )
+
+    def test_snapshots_of_exited_processes_are_folded(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.client.get(FLIGHT_URL)
+
+        with override_settings(PERF_METRICS_DIR=directory):
+            registry.flush()
+            # A worker that exited without folding its own snapshot
+            os.rename(
+                os.path.join(directory, f"perf-{os.getpid()}.json"),
+                os.path.join(directory, "perf-999999999.json"),
+            )
+            registry.reset()
+            self.client.get(FLIGHT_URL)
+            registry.flush()
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                sorted([MERGED_SNAPSHOT, f"perf-{os.getpid()}.json",
+                        "perf.lock"]),
+            )
+
+            registry.retire()
+            self.assertNotIn(f"perf-{os.getpid()}.json", os.listdir(directory))
+            views = load_snapshots()
+
+        with open(os.path.join(directory, MERGED_SNAPSHOT)) as snapshot:
+            self.assertIn("FlightViewSet.list", json.load(snapshot)["views"])
+        self.assertEqual(views["FlightViewSet.list"]["wall_seconds"].count, 2)
+
+    def test_histogram_quantile(self):
+        histogram = Histogram(TIME_BUCKETS)
+        for value in (0.001, 0.002, 0.003, 0.2):
+            histogram.observe(value)
+
+        self.assertLessEqual(histogram.quantile(0.5), 0.005)
+        self.assertGreater(histogram.quantile(0.99), 0.1)
+        self.assertEqual(histogram.count, 4)
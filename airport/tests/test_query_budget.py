@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Order, SeatInventory, Ticket
+from airport.tests.test_airport_api import (
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+    sample_route,
+)
+
+ROW_COUNTS = (1, 10, 100)
+
+
+class QueryBudgetTestCase(TestCase):
+    """Endpoints must render with a fixed number of queries.
+
+    Each test grows the table to every size in ROW_COUNTS and checks that
+    the endpoint keeps the same query budget.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def assert_list_budget(self, url, create_row, budget):
+        created = 0
+        for row_count in ROW_COUNTS:
+            while created < row_count:
+                create_row()
+                created += 1
+            with self.subTest(rows=row_count):
+                with self.assertNumQueries(budget):
+                    res = self.client.get(url, {"page_size": 100})
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(res.data["results"]), row_count)
+
+
+class FlightQueryBudgetTests(QueryBudgetTestCase):
+    def test_flight_list(self):
+        self.assert_list_budget(
+            reverse("airport:flight-list"), sample_flight, budget=1
+        )
+
+    def test_flight_detail(self):
+        flight = sample_flight()
+        flight.crews.set(
+            Crew.objects.create(first_name=f"Crew{i}", last_name="Member")
+            for i in range(10)
+        )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                reverse("airport:flight-detail", args=[flight.id])
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class ReferenceDataQueryBudgetTests(QueryBudgetTestCase):
+    def test_route_list(self):
+        self.assert_list_budget(
+            reverse("airport:route-list"), sample_route, budget=1
+        )
+
+    def test_airplane_list(self):
+        self.assert_list_budget(
+            reverse("airport:airplane-list"), sample_airplane, budget=1
+        )
+
+    def test_airport_list(self):
+        self.assert_list_budget(
+            reverse("airport:airport-list"), sample_airport, budget=1
+        )
+
+    def test_crew_list(self):
+        self.assert_list_budget(
+            reverse("airport:crew-list"),
+            lambda: Crew.objects.create(first_name="Crew", last_name="Member"),
+            budget=1,
+        )
+
+
+class OrderQueryBudgetTests(QueryBudgetTestCase):
+    def test_order_list(self):
+        flights = [sample_flight() for _ in range(3)]
+
+        def create_order():
+            order = Order.objects.create(user=self.user)
+            for flight in flights:
+                inventory = SeatInventory.objects.get(flight=flight)
+                row, seat = divmod(inventory.seats_taken, 6)
+                Ticket.objects.create(
+                    row=row + 1, seat=seat + 1, flight=flight, order=order
+                )
+
+        self.assert_list_budget(
+            reverse("airport:order-list"),
+            create_order,
+            budget=3,
+        )
+
+    def test_order_list_reports_tickets_available(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        res = self.client.get(reverse("airport:order-list"))
+
+        ticket = res.data["results"][0]["tickets"][0]
+        self.assertEqual(ticket["flight"]["tickets_available"], 179)
@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Flight
+from airport.querycheck import QueryCheckError, QueryInspector, normalize
+from airport.tests.test_airport_api import sample_flight
+from airport.views import FlightViewSet
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class QueryCheckTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        for _ in range(6):
+            sample_flight()
+
+    def test_normalize(self):
+        self.assertEqual(
+            normalize(
+                'SELECT "id" FROM "airport_flight" WHERE "id" IN (%s, %s) '
+                "AND name = 'Kyiv' LIMIT 21"
+            ),
+            'SELECT "id" FROM "airport_flight" WHERE "id" IN (...) '
+            "AND name = ? LIMIT ?",
+        )
+
+    def test_inspector_flags_repeated_shapes(self):
+        with QueryInspector("loop") as inspector:
+            for flight in Flight.objects.all():
+                flight.route.distance
+
+        problems = inspector.problems()
+        self.assertEqual(len(problems), 1)
+        self.assertTrue(problems[0].startswith("6 x SELECT"))
+        self.assertIn('"airport_route"', problems[0])
+
+    def test_request_with_n_plus_one_fails(self):
+        with mock.patch.object(
+            FlightViewSet,
+            "queryset",
+            Flight.objects.with_tickets_available(),
+        ):
+            with self.assertRaisesMessage(
+                QueryCheckError, "Repeated queries in airport:flight-list"
+            ):
+                self.client.get(FLIGHT_URL)
+
+    def test_request_without_n_plus_one_passes(self):
+        with self.settings(QUERY_CHECK_MAX_QUERIES=1):
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(len(res.data["results"]), 6)
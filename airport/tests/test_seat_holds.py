@@ -0,0 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import SeatHold, SeatInventory
+from airport.tests.test_airport_api import sample_flight
+
+SEAT_HOLD_URL = reverse("airport:seathold-list")
+ORDER_URL = reverse("airport:order-list")
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def hold(self, *places, **extra):
+        return self.client.post(
+            SEAT_HOLD_URL,
+            {
+                "flight": self.flight.id,
+                "seats": [{"row": row, "seat": seat} for row, seat in places],
+                **extra,
+            },
+            format="json",
+        )
+
+    def order(self, *places):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in places
+                ]
+            },
+            format="json",
+        )
+
+    def test_holds_count_toward_availability(self):
+        res = self.hold((1, 1), (1, 2))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 178)
+
+    def test_hold_converted_into_ticket(self):
+        self.hold((1, 1))
+
+        res = self.order((1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual((inventory.seats_taken, inventory.seats_held), (1, 0))
+
+    def test_seat_held_by_another_user_conflicts(self):
+        self.hold((2, 2))
+        self.client.force_authenticate(self.other_user)
+
+        self.assertEqual(
+            self.hold((2, 2)).status_code, status.HTTP_409_CONFLICT
+        )
+        self.assertEqual(
+            self.order((2, 2)).status_code, status.HTTP_409_CONFLICT
+        )
+
+    def test_ttl_above_maximum_rejected(self):
+        res = self.hold((1, 1), ttl=24 * 60 * 60)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_release_hold(self):
+        hold_id = self.hold((3, 3)).data[0]["id"]
+
+        res = self.client.delete(
+            reverse("airport:seathold-detail", args=[hold_id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.seats_held, 0)
+
+    def test_expired_holds_swept_in_bulk(self):
+        self.hold((1, 1), (1, 2), (1, 3))
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+        other_flight = sample_flight()
+        SeatHold.objects.create(
+            flight=other_flight,
+            user=self.user,
+            row=1,
+            seat=1,
+            expires_at=timezone.now() + timedelta(1),
+        )
+
+        call_command("expire_seat_holds", stdout=StringIO())
+
+        self.assertEqual(SeatHold.objects.count(), 1)
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.seats_held, 0)
+
+    def test_expired_hold_of_other_user_can_be_ordered(self):
+        self.hold((4, 4))
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+        self.client.force_authenticate(self.other_user)
+
+        res = self.order((4, 4))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_holds_deleted_outside_booking_are_cleared(self):
+        self.hold((1, 1), (1, 2))
+        self.client.force_authenticate(self.other_user)
+        self.hold((2, 1))
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.seats_held, 3)
+
+        self.user.delete()
+
+        inventory.refresh_from_db()
+        self.assertEqual(inventory.seats_held, 1)
+        self.assertFalse(inventory.is_held(1, 1))
+        self.assertTrue(inventory.is_held(2, 1))
+
+        SeatHold.objects.all().delete()
+
+        inventory.refresh_from_db()
+        self.assertEqual(inventory.seats_held, 0)
+        self.assertEqual(inventory.seats_free, inventory.capacity)
@@ -0,0 +1,234 @@
+import base64
+import importlib
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, SeatInventory, Ticket
+from airport.tests.test_airport_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+class SeatInventoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_inventory_created_with_flight(self):
+        inventory = SeatInventory.objects.get(flight=self.flight)
+
+        self.assertEqual(inventory.capacity, 180)
+        self.assertEqual(inventory.seats_taken, 0)
+        self.assertEqual(len(inventory.seat_map), 23)
+
+    def test_order_marks_seats_taken(self):
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "flight": self.flight.id},
+                    {"row": 30, "seat": 6, "flight": self.flight.id},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.seats_taken, 2)
+        self.assertTrue(inventory.is_taken(1, 1))
+        self.assertTrue(inventory.is_taken(30, 6))
+        self.assertFalse(inventory.is_taken(1, 2))
+
+        res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 178)
+
+        res = self.client.get(detail_url(self.flight.id))
+        self.assertEqual(
+            res.data["taken_places"],
+            [{"row": 1, "seat": 1}, {"row": 30, "seat": 6}],
+        )
+
+    def test_ticket_delete_releases_seat(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=5, seat=3, flight=self.flight, order=order
+        )
+
+        ticket.delete()
+
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.seats_taken, 0)
+        self.assertFalse(inventory.is_taken(5, 3))
+
+    def test_ticket_moved_to_other_flight_releases_old_seat(self):
+        other_flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=5, seat=3, flight=self.flight, order=order
+        )
+
+        ticket.flight = other_flight
+        ticket.save()
+
+        self.assertFalse(
+            SeatInventory.objects.get(flight=self.flight).is_taken(5, 3)
+        )
+        self.assertTrue(
+            SeatInventory.objects.get(flight=other_flight).is_taken(5, 3)
+        )
+
+    def test_migration_backfill(self):
+        migration = importlib.import_module(
+            "airport.migrations.0006_seatinventory"
+        )
+        other_flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        for flight, row in ((self.flight, 1), (other_flight, 2)):
+            Ticket.objects.create(
+                row=row, seat=1, flight=flight, order=order
+            )
+        SeatInventory.objects.all().delete()
+
+        with self.assertNumQueries(4):
+            migration.build_seat_inventories(apps, None)
+
+        self.assertTrue(
+            SeatInventory.objects.get(flight=self.flight).is_taken(1, 1)
+        )
+        inventory = SeatInventory.objects.get(flight=other_flight)
+        self.assertEqual(inventory.seats_taken, 1)
+        self.assertTrue(inventory.is_taken(2, 1))
+
+    def test_inventory_tracks_seats_free(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=5, seat=3, flight=self.flight, order=order)
+
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.seats_free, 179)
+
+    def test_filter_and_order_by_tickets_available(self):
+        full_flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        for seat in range(1, 4):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=full_flight, order=order
+            )
+
+        res = self.client.get(FLIGHT_URL, {"ordering": "tickets_available"})
+        self.assertEqual(
+            [flight["id"] for flight in res.data["results"]],
+            [full_flight.id, self.flight.id],
+        )
+
+        res = self.client.get(FLIGHT_URL, {"min_available": 178})
+        self.assertEqual(
+            [flight["id"] for flight in res.data["results"]],
+            [self.flight.id],
+        )
+
+        res = self.client.get(FLIGHT_URL, {"min_available": "many"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_paginate_by_tickets_available_with_ties(self):
+        flights = [self.flight] + [sample_flight() for _ in range(6)]
+        order = Order.objects.create(user=self.user)
+        for flight in flights[::2]:
+            Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        ids = []
+        res = self.client.get(
+            FLIGHT_URL, {"ordering": "-tickets_available", "page_size": 2}
+        )
+        while True:
+            ids += [flight["id"] for flight in res.data["results"]]
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            ids,
+            [flight.id for flight in flights[1::2] + flights[::2]],
+        )
+        self.assertEqual(res.data["results"][-1]["tickets_available"], 179)
+
+    def test_availability_uses_inventory_column(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                FLIGHT_URL,
+                {"ordering": "tickets_available", "min_available": 1},
+            )
+
+        sql = queries[-1]["sql"]
+        self.assertIn('INNER JOIN "airport_seatinventory"', sql)
+        self.assertIn('"airport_seatinventory"."seats_free" >= 1', sql)
+        self.assertNotIn("COALESCE", sql)
+
+    def test_rebuild_command_fixes_drifted_inventory(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=5, seat=3, flight=self.flight, order=order)
+        SeatInventory.objects.filter(flight=self.flight).update(
+            seats_taken=0, seat_map=bytes(23), seats_free=180
+        )
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_seat_inventory", verify=True, stdout=StringIO()
+            )
+
+        out = StringIO()
+        call_command("rebuild_seat_inventory", stdout=out)
+        self.assertIn("1 of 1 seat inventories rebuilt", out.getvalue())
+
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertTrue(inventory.is_taken(5, 3))
+        self.assertEqual(inventory.seats_free, 179)
+        call_command("rebuild_seat_inventory", verify=True, stdout=StringIO())
+
+    def test_seatmap(self):
+        order = Order.objects.create(user=self.user)
+        for row, seat in ((1, 1), (1, 2), (2, 6)):
+            Ticket.objects.create(
+                row=row, seat=seat, flight=self.flight, order=order
+            )
+        url = reverse("airport:flight-seatmap", args=[self.flight.id])
+
+        with self.assertNumQueries(1):
+            res = self.client.get(url)
+        self.assertEqual(res.data["rows"], 30)
+        self.assertEqual(res.data["seats_free"], 177)
+        occupancy = base64.b64decode(res.data["occupancy"])
+        self.assertEqual(len(occupancy), 23)
+        self.assertEqual(occupancy[:2], bytes([0b11, 0b1000]))
+
+        res = self.client.get(url, {"encoding": "runs"})
+        self.assertEqual(res.data["occupancy"], [0, 2, 9, 1, 168])
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                url, {"encoding": "runs"}, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Ticket.objects.create(row=1, seat=3, flight=self.flight, order=order)
+        res = self.client.get(url, {"encoding": "runs"})
+        self.assertEqual(res.data["occupancy"], [0, 3, 8, 1, 168])
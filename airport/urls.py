@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework import routers
 
+from airport.async_views import async_read_view
+
 from airport.views import (
     AirportViewSet,
     AirplaneViewSet,
     AirplaneTypeViewSet,
     CrewViewSet,
+    ExportViewSet,
     RouteViewSet,
     FlightViewSet,
+    ItineraryViewSet,
     OrderViewSet,
+    SeatHoldViewSet,
+    metrics,
 )
 
 router = routers.DefaultRouter()
@@ -19,7 +26,42 @@ router.register("crews", CrewViewSet)
 router.register("routes", RouteViewSet)
 router.register("flights", FlightViewSet, basename="flight")
 router.register("orders", OrderViewSet)
+router.register("itineraries", ItineraryViewSet, basename="itinerary")
+router.register("seat_holds", SeatHoldViewSet)
+router.register("exports", ExportViewSet, basename="export")
 
 urlpatterns = [path("", include(router.urls))]
 
+if settings.PERF_METRICS_ENDPOINT:
+    urlpatterns.append(path("metrics/", metrics, name="metrics"))
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path(
+            "flights/",
+            async_read_view(
+                FlightViewSet, {"get": "list", "post": "create"}
+            ),
+            name="flight-list",
+        ),
+        path(
+            "flights/<int:pk>/",
+            async_read_view(
+                FlightViewSet,
+                {
+                    "get": "retrieve",
+                    "put": "update",
+                    "patch": "partial_update",
+                    "delete": "destroy",
+                },
+            ),
+            name="flight-detail",
+        ),
+        path(
+            "itineraries/",
+            async_read_view(ItineraryViewSet, {"get": "list"}),
+            name="itinerary-list",
+        ),
+    ] + urlpatterns
+
 app_name = "airport"
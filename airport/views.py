@@ -1,12 +1,21 @@
-from datetime import datetime
-from django.db.models import F, Count
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
-from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.viewsets import GenericViewSet
 
 from airport.models import (
@@ -16,7 +25,9 @@ from airport.models import (
     Airplane,
     Crew,
     Flight,
-    Order
+    Order,
+    SeatHold,
+    SeatInventory,
 )
 from airport.serializers import (
     AirportSerializer,
@@ -34,39 +45,131 @@ from airport.serializers import (
     OrderSerializer,
     OrderListSerializer,
     AirplaneImageSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
+    SeatMapSerializer,
+)
+from airport.booking import release_holds
+from airport.caching import (
+    CachedListMixin,
+    CachedRetrieveMixin,
+    flight_version_name,
+)
+from airport.exports import CONTENT_TYPES, EXPORTS, render_export
+from airport.itineraries import flight_index
+from airport.pagination import KeysetCursorPagination
+from airport.perf import (
+    TimedSerializerMixin,
+    load_snapshots,
+    registry,
+    render_prometheus,
 )
 
 
+class IdCursorPagination(KeysetCursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",)
+
+
+class FlightPagination(IdCursorPagination):
+    ordering = ("departure_time", "id")
+    availability_orderings = {
+        "tickets_available": ("tickets_available", "departure_time", "id"),
+        "-tickets_available": ("-tickets_available", "departure_time", "id"),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get("ordering")
+        if ordering is None:
+            return self.ordering
+        if ordering not in self.availability_orderings:
+            raise ValidationError(
+                {
+                    "ordering": "Use one of: "
+                    + ", ".join(self.availability_orderings)
+                }
+            )
+        return self.availability_orderings[ordering]
+
+
+class OrderPagination(IdCursorPagination):
+    page_size = 10
+    ordering = ("-created_at", "-id")
+
+
+class BulkCreateMixin:
+    """Create a list of objects with one POST to ``<prefix>/bulk/``.
+
+    Errors are reported per item, in the order of the request.
+    """
+
+    @action(methods=["POST"], detail=False)
+    def bulk(self, request):
+        max_items = getattr(settings, "BULK_CREATE_MAX_ITEMS", 1000)
+        if isinstance(request.data, list) and len(request.data) > max_items:
+            raise ValidationError(
+                {"non_field_errors": [f"Send at most {max_items} items."]}
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class AirportViewSet(
+    TimedSerializerMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
+    pagination_class = IdCursorPagination
+    cache_models = (Airport,)
 
 
 class AirplaneTypeViewSet(
+    TimedSerializerMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
+    pagination_class = IdCursorPagination
+    cache_models = (AirplaneType,)
 
 
 class CrewViewSet(
+    TimedSerializerMixin,
+    CachedListMixin,
+    BulkCreateMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
+    pagination_class = IdCursorPagination
+    cache_models = (Crew,)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(
+    TimedSerializerMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Airplane.objects.all().select_related("airplane_type")
     serializer_class = AirplaneSerializer
+    pagination_class = IdCursorPagination
+    cache_models = (Airplane, AirplaneType)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -78,7 +181,7 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return AirplaneSerializer
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
         airplane_type = self.request.query_params.get("airplane_type")
         name = self.request.query_params.get("name")
 
@@ -125,9 +228,10 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(TimedSerializerMixin, viewsets.ModelViewSet):
     queryset = Route.objects.all().select_related("source", "destination")
     serializer_class = RouteSerializer
+    pagination_class = IdCursorPagination
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -137,19 +241,29 @@ class RouteViewSet(viewsets.ModelViewSet):
         return RouteSerializer
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(
+    TimedSerializerMixin,
+    CachedRetrieveMixin,
+    BulkCreateMixin,
+    viewsets.ModelViewSet,
+):
     queryset = (
-        Flight.objects.all()
-        .select_related("route", "airplane")
-        .prefetch_related("crews")
-        .annotate(
-            tickets_available=(
-                    F("airplane__rows") * F("airplane__seats_in_row")
-                    - Count("tickets")
-            )
+        Flight.objects.with_tickets_available()
+        .select_related(
+            "route__source",
+            "route__destination",
+            "airplane",
+            "seat_inventory",
         )
     )
     serializer_class = FlightSerializer
+    pagination_class = FlightPagination
+    cache_models = (Route, Airport, Airplane, AirplaneType, Crew)
+
+    def get_cache_version_names(self):
+        return super().get_cache_version_names() + [
+            flight_version_name(self.kwargs[self.lookup_field])
+        ]
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -159,23 +273,114 @@ class FlightViewSet(viewsets.ModelViewSet):
         return FlightSerializer
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
         route = self.request.query_params.get("route")
         airplane = self.request.query_params.get("airplane")
         departure_time = self.request.query_params.get("departure_time")
-
+        departure_from = self.request.query_params.get("departure_from")
+        departure_to = self.request.query_params.get("departure_to")
+        min_available = self.request.query_params.get("min_available")
+        ordering = self.request.query_params.get("ordering")
+
+        if self.action == "retrieve":
+            queryset = queryset.select_related(
+                "airplane__airplane_type"
+            ).prefetch_related("crews")
         if route:
             queryset = queryset.filter(route__id=route)
         if airplane:
             queryset = queryset.filter(airplane__id=airplane)
         if departure_time:
-            departure_datetime = datetime.strptime(departure_time, "%Y-%m-%d")
+            day_start = self._parse_departure("departure_time", departure_time)
+            queryset = queryset.filter(
+                departure_time__gte=day_start,
+                departure_time__lt=day_start + timedelta(days=1),
+            )
+        if departure_from:
             queryset = queryset.filter(
-                departure_time__date=departure_datetime.date()
+                departure_time__gte=self._parse_departure(
+                    "departure_from", departure_from
+                )
             )
+        if departure_to:
+            queryset = queryset.filter(
+                departure_time__lt=self._parse_departure(
+                    "departure_to", departure_to
+                )
+            )
+        if min_available:
+            try:
+                min_available = int(min_available)
+            except ValueError:
+                raise ValidationError({"min_available": "Use an integer."})
+            queryset = queryset.filter(
+                seat_inventory__seats_free__gte=min_available
+            )
+        if ordering in FlightPagination.availability_orderings:
+            # An inner join lets inventory_seats_free_idx serve the order
+            queryset = queryset.filter(seat_inventory__isnull=False)
 
         return queryset
 
+    @staticmethod
+    def _parse_departure(param, value):
+        """Parse a date or datetime query param into an aware datetime.
+
+        Dates and naive datetimes are taken in the current time zone.
+        """
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                parsed_date = parse_date(value)
+                if parsed_date is not None:
+                    parsed = datetime.combine(parsed_date, time.min)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError(
+                {param: "Use YYYY-MM-DD or an ISO 8601 datetime."}
+            )
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type=OpenApiTypes.STR,
+                enum=list(SeatMapSerializer.ENCODINGS),
+                description="Occupancy encoding, bitmap by default "
+                            "(ex. ?encoding=runs)",
+            ),
+        ],
+        responses=SeatMapSerializer,
+    )
+    @action(methods=["GET"], detail=True)
+    def seatmap(self, request, pk=None):
+        """Compact occupancy of every seat of the flight"""
+        encoding = request.query_params.get("encoding", "bitmap")
+        if encoding not in SeatMapSerializer.ENCODINGS:
+            raise ValidationError(
+                {
+                    "encoding": "Use one of: "
+                    + ", ".join(SeatMapSerializer.ENCODINGS)
+                }
+            )
+
+        def render():
+            flight = self.get_object()
+            try:
+                inventory = flight.seat_inventory
+            except SeatInventory.DoesNotExist:
+                inventory = SeatInventory.build(flight)
+            serializer = SeatMapSerializer(
+                inventory, context={"encoding": encoding}
+            )
+            return Response(serializer.data)
+
+        return self.cached_response(request, render)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -194,30 +399,149 @@ class FlightViewSet(viewsets.ModelViewSet):
                 description="Filter by departure date "
                             "(ex. ?departure_time=2024-06-11)",
             ),
+            OpenApiParameter(
+                "departure_from",
+                type=OpenApiTypes.DATETIME,
+                description="Flights departing at or after this moment "
+                            "(ex. ?departure_from=2024-06-11T08:00+02:00)",
+            ),
+            OpenApiParameter(
+                "departure_to",
+                type=OpenApiTypes.DATETIME,
+                description="Flights departing before this moment "
+                            "(ex. ?departure_to=2024-06-12)",
+            ),
+            OpenApiParameter(
+                "min_available",
+                type=OpenApiTypes.INT,
+                description="Flights with at least this many free seats "
+                            "(ex. ?min_available=2)",
+            ),
+            OpenApiParameter(
+                "ordering",
+                type=OpenApiTypes.STR,
+                enum=["tickets_available", "-tickets_available"],
+                description="Order by free seats, then departure time "
+                            "(ex. ?ordering=-tickets_available)",
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class OrderPagination(PageNumberPagination):
-    page_size = 10
-    max_page_size = 100
+class ItineraryViewSet(TimedSerializerMixin, GenericViewSet):
+    serializer_class = ItinerarySerializer
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = (ScopedRateThrottle,)
+    throttle_scope = "itineraries"
+
+    @extend_schema(
+        parameters=[ItinerarySearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    def list(self, request, *args, **kwargs):
+        """Find connecting flight chains between two airports"""
+        search = ItinerarySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+
+        itineraries = flight_index.search(
+            params["source"],
+            params["destination"],
+            params["departure_from"],
+            params["departure_to"],
+            max_legs=params["max_connections"] + 1,
+            min_connection=timedelta(minutes=params["min_connection"]),
+            max_connection=timedelta(minutes=params["max_connection"]),
+            sort=params["sort"],
+            limit=params["limit"],
+        )
+
+        flights = (
+            Flight.objects.with_tickets_available()
+            .select_related("route__source", "route__destination", "airplane")
+            .in_bulk(
+                {leg.flight_id for found in itineraries for leg in found.legs}
+            )
+        )
+        results = [
+            {
+                "departure_time": found.legs[0].departure_time,
+                "arrival_time": found.legs[-1].arrival_time,
+                "duration": found.duration // timedelta(minutes=1),
+                "distance": found.distance,
+                "connections": len(found.legs) - 1,
+                "flights": [flights[leg.flight_id] for leg in found.legs],
+            }
+            for found in itineraries
+            if all(leg.flight_id in flights for leg in found.legs)
+        ]
+        serializer = self.get_serializer(results, many=True)
+        return Response(serializer.data)
+
+
+class SeatHoldViewSet(
+    TimedSerializerMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            user=self.request.user, expires_at__gt=timezone.now()
+        )
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return SeatHoldCreateSerializer
+        return SeatHoldSerializer
+
+    @extend_schema(responses={201: SeatHoldSerializer(many=True)})
+    def create(self, request, *args, **kwargs):
+        """Hold seats of a flight until they are ordered or expire"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        holds = serializer.save(user=request.user)
+        return Response(
+            SeatHoldSerializer(holds, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    def perform_destroy(self, instance):
+        release_holds([instance])
 
 
 class OrderViewSet(
+    TimedSerializerMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet,
 ):
-    queryset = Order.objects.prefetch_related(
-        "tickets__flight__route", "tickets__flight__airplane"
-    )
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        queryset = super().get_queryset().filter(user=self.request.user)
+
+        if self.action == "list":
+            queryset = queryset.prefetch_related(
+                "tickets",
+                Prefetch(
+                    "tickets__flight",
+                    queryset=Flight.objects.with_tickets_available()
+                    .select_related(
+                        "route__source", "route__destination", "airplane"
+                    ),
+                ),
+            )
+
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -227,3 +551,49 @@ class OrderViewSet(
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class ExportViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+    lookup_field = "dataset"
+    lookup_value_regex = "|".join(EXPORTS)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "output",
+                type=OpenApiTypes.STR,
+                enum=list(CONTENT_TYPES),
+                description="Export format, csv by default "
+                            "(ex. ?output=ndjson)",
+            ),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+    )
+    def retrieve(self, request, dataset=None):
+        """Stream every flight, ticket or order as CSV or NDJSON"""
+        output_format = request.query_params.get("output", "csv")
+        if output_format not in CONTENT_TYPES:
+            raise ValidationError(
+                {"output": f"Use one of: {', '.join(CONTENT_TYPES)}"}
+            )
+        response = StreamingHttpResponse(
+            render_export(dataset, output_format),
+            content_type=CONTENT_TYPES[output_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{dataset}.{output_format}"'
+        )
+        return response
+
+
+@extend_schema(exclude=True)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """Per view request histograms of all processes for Prometheus"""
+    registry.flush()
+    return HttpResponse(
+        render_prometheus(load_snapshots()),
+        content_type="text/plain; version=0.0.4",
+    )
@@ -13,6 +13,11 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+try:
+    import whitenoise
+except ImportError:
+    whitenoise = None
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,9 +28,12 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ["SECRET_KEY"]
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Off unless DEBUG=1 is set, e.g. in a local .env.
+DEBUG = os.environ.get("DEBUG", "0") == "1"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("ALLOWED_HOSTS", "").split(",") if host
+]
 
 # Application definition
 
@@ -44,6 +52,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "airport.middleware.PerfMiddleware",
+    "airport.querycheck.QueryCheckMiddleware",
+    "airport.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,6 +64,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if whitenoise is not None:
+    # Serve collected static files (admin, API docs) from the app server.
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "whitenoise.middleware.WhiteNoiseMiddleware",
+    )
+
 ROOT_URLCONF = "airport_service.urls"
 
 TEMPLATES = [
@@ -84,12 +102,127 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": os.environ["POSTGRES_PORT"],
+        # Keep connections open between requests of a worker thread.
+        # Django 4.0 has no built-in pool, so the pool size is the number
+        # of gunicorn workers times threads.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            # Lifted for migrate, whose backfills may run longer.
+            "options": "-c statement_timeout={}".format(
+                int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+            ),
+        },
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Local memory by default. Cached responses are invalidated through version
+# keys, so deployments with several worker processes need a backend they
+# all share: django.core.cache.backends.redis.RedisCache, whose incr is
+# atomic and whose reads do not go through Postgres. DatabaseCache (run
+# createcachetable) works as a fallback, but costs database round trips
+# per cached response and may lose version bumps of concurrent writes.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "airport-service"),
+    }
+}
+
+AIRPORT_CACHE_ALIAS = "default"
+
+# Worker processes of the deployment, see gunicorn.conf.py. More than one
+# requires a shared cache backend.
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+
+# Seat booking
+
+BOOKING_MAX_ATTEMPTS = 3
+
+BOOKING_RETRY_BACKOFF = 0.05
+
+BOOKING_LOCK_TIMEOUT_MS = 2000
+
+SEAT_HOLD_TTL = 10 * 60
+
+SEAT_HOLD_MAX_TTL = 30 * 60
+
+# Serve flight and itinerary reads from async views under ASGI
+
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "") == "1"
+
+# Request performance metrics, see the perf_report command
+
+PERF_METRICS_DIR = os.environ.get("PERF_METRICS_DIR") or None
+
+PERF_METRICS_FLUSH_INTERVAL = 30
+
+PERF_METRICS_ENDPOINT = os.environ.get("PERF_METRICS_ENDPOINT", "") == "1"
+
+# Flag repeated query shapes (N+1) and slow queries per request.
+# The test runner enables it and turns findings into failures.
+
+QUERY_CHECK_ENABLED = os.environ.get("QUERY_CHECK_ENABLED", "") == "1"
+
+QUERY_CHECK_RAISE = False
+
+QUERY_CHECK_REPEAT_THRESHOLD = 5
+
+QUERY_CHECK_MAX_QUERIES = None
+
+QUERY_CHECK_SLOW_MS = 200
+
+TEST_RUNNER = "airport.testing.QueryCheckTestRunner"
+
+# Bulk exports and inserts
+
+EXPORT_CHUNK_SIZE = 2000
+
+BULK_CREATE_MAX_ITEMS = 1000
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
+# New passwords are hashed with PASSWORD_HASHER (argon2, bcrypt or
+# pbkdf2); the others stay listed so existing hashes still verify and are
+# upgraded on the next login. Costs can only be raised above Django's
+# defaults, see user/hashers.py.
+PASSWORD_HASHER_CLASSES = {
+    "argon2": "user.hashers.Argon2PasswordHasher",
+    "bcrypt": "user.hashers.BCryptSHA256PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *(
+        hasher
+        for name, hasher in PASSWORD_HASHER_CLASSES.items()
+        if name != PASSWORD_HASHER
+    ),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+ARGON2_TIME_COST = int(os.environ.get("ARGON2_TIME_COST", 2))
+ARGON2_MEMORY_COST = int(os.environ.get("ARGON2_MEMORY_COST", 102400))
+ARGON2_PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", 1))
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+# Passwords are hashed by a bounded pool of threads per process. Fewer
+# requests than the worker's REQUEST_THREADS (gunicorn threads) may hash
+# or wait for a hash at a time, further ones get a 503 right away.
+REQUEST_THREADS = int(os.environ.get("GUNICORN_THREADS", 4))
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 1))
+PASSWORD_HASH_QUEUE_TIMEOUT = 0
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -120,6 +253,8 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
 STATIC_URL = "static/"
+# Filled by collectstatic, which docker-compose runs on start.
+STATIC_ROOT = "/files/static"
 
 MEDIA_ROOT = "/files/media"
 MEDIA_URL = "/media/"
@@ -137,9 +272,16 @@ INTERNAL_IPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "airport.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
+    "DEFAULT_THROTTLE_RATES": {
+        "itineraries": os.environ.get("ITINERARY_THROTTLE_RATE", "60/min"),
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -160,3 +302,16 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=31),
     "ROTATE_REFRESH_TOKENS": False,
 }
+
+# Authenticated users are cached per process for JWT_USER_CACHE_TTL
+# seconds; JWT_CLAIM_ONLY_READS trusts the token claims on safe requests
+# to views guarded by IsAdminOrIfAuthenticatedReadOnly.
+JWT_USER_CACHE_TTL = int(os.environ.get("JWT_USER_CACHE_TTL", 60))
+JWT_USER_CACHE_SIZE = int(os.environ.get("JWT_USER_CACHE_SIZE", 10000))
+JWT_CLAIM_ONLY_READS = os.environ.get("JWT_CLAIM_ONLY_READS", "") == "1"
+
+# Text responses of at least COMPRESSION_MIN_SIZE bytes are compressed
+# with brotli (when installed) or gzip, whichever the client accepts.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_GZIP_LEVEL = 6
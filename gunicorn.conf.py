@@ -0,0 +1,46 @@
+"""Gunicorn settings of the production WSGI deployment.
+
+Every value can be overridden with an environment variable, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Threaded workers keep one persistent database connection per thread.
+worker_class = "gthread"
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to cap slow memory growth.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Refuse to run several workers on a per process cache.
+
+    Cache invalidation relies on version keys every worker can see.
+    """
+    if server.cfg.workers <= 1:
+        return
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "airport_service.settings")
+    from airport.caching import is_process_local
+
+    if is_process_local():
+        raise RuntimeError(
+            f"{server.cfg.workers} workers configured but CACHE_BACKEND is "
+            "local to each process; use a shared cache backend such as "
+            "django.core.cache.backends.redis.RedisCache or set "
+            "WEB_CONCURRENCY=1."
+        )
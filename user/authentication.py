@@ -0,0 +1,120 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+
+
+class UserCache:
+    """Size bounded LRU of users keyed by id, entries expire after a TTL.
+
+    Entries are dropped by the ``User`` signals of this process; other
+    processes see a change at most ``JWT_USER_CACHE_TTL`` seconds later.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+        # Views may change request.user, so every request gets a copy.
+        return copy.copy(user)
+
+    def set(self, user):
+        ttl = getattr(settings, "JWT_USER_CACHE_TTL", 60)
+        max_size = getattr(settings, "JWT_USER_CACHE_SIZE", 10000)
+        if ttl <= 0 or max_size <= 0:
+            return
+        with self._lock:
+            self._users[user.pk] = (copy.copy(user), time.monotonic() + ttl)
+            self._users.move_to_end(user.pk)
+            while len(self._users) > max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that looks users up in ``user_cache`` first.
+
+    With ``JWT_CLAIM_ONLY_READS`` safe requests to views guarded only by
+    ``IsAdminOrIfAuthenticatedReadOnly`` skip the lookup altogether and
+    get a ``TokenUser`` built from the token claims, unless the user is
+    cached as inactive.
+    """
+
+    claims_only = False
+
+    def authenticate(self, request):
+        self.claims_only = self.allows_claims_only(request)
+        return super().authenticate(request)
+
+    @staticmethod
+    def allows_claims_only(request):
+        if not getattr(settings, "JWT_CLAIM_ONLY_READS", False):
+            return False
+        if request.method not in SAFE_METHODS:
+            return False
+        view = (getattr(request, "parser_context", None) or {}).get("view")
+        permission_classes = getattr(view, "permission_classes", ())
+        return bool(permission_classes) and all(
+            issubclass(permission, IsAdminOrIfAuthenticatedReadOnly)
+            for permission in permission_classes
+        )
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        user = user_cache.get(user_id)
+        if user is None and self.claims_only:
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                )
+            user_cache.set(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
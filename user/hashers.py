@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with costs from settings, never below Django's defaults.
+
+    ``ARGON2_PARALLELISM`` defaults to 1: the same memory and passes are
+    computed on one core instead of eight, so concurrent registrations
+    don't compete for every core of a worker.
+    """
+
+    @property
+    def time_cost(self):
+        return max(getattr(settings, "ARGON2_TIME_COST", 2), 2)
+
+    @property
+    def memory_cost(self):
+        return max(getattr(settings, "ARGON2_MEMORY_COST", 102400), 102400)
+
+    @property
+    def parallelism(self):
+        return max(getattr(settings, "ARGON2_PARALLELISM", 1), 1)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return max(getattr(settings, "BCRYPT_ROUNDS", 12), 12)
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many passwords are being hashed, retry shortly."
+    default_code = "password_hashing_busy"
+
+
+class HashingPool:
+    """Bounded thread pool hashing passwords outside request threads.
+
+    Argon2, bcrypt and PBKDF2 release the GIL, so at most
+    ``PASSWORD_HASH_WORKERS`` hashes run in parallel per process. Up to
+    ``PASSWORD_HASH_QUEUE`` more wait for a worker; beyond that callers
+    wait ``PASSWORD_HASH_QUEUE_TIMEOUT`` seconds for room and then get
+    ``PasswordHashingBusy``. The caller's thread is held while its hash
+    runs, so hashing and waiting requests are capped below
+    ``REQUEST_THREADS`` and a burst of registrations cannot take every
+    request thread of a worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def _start(self):
+        with self._lock:
+            if self._executor is None:
+                workers = getattr(settings, "PASSWORD_HASH_WORKERS", 2)
+                queue = getattr(settings, "PASSWORD_HASH_QUEUE", 1)
+                threads = getattr(settings, "REQUEST_THREADS", None)
+                slots = workers + queue
+                if threads:
+                    slots = min(slots, max(threads - 1, 1))
+                self._slots = threading.BoundedSemaphore(slots)
+                self._executor = ThreadPoolExecutor(
+                    workers, thread_name_prefix="password-hash"
+                )
+        return self._executor, self._slots
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = self._slots = None
+
+    def make_password(self, password):
+        executor, slots = self._start()
+        timeout = getattr(settings, "PASSWORD_HASH_QUEUE_TIMEOUT", 0)
+        if not slots.acquire(timeout=timeout):
+            raise PasswordHashingBusy()
+        try:
+            return executor.submit(hashers.make_password, password).result()
+        finally:
+            slots.release()
+
+
+hashing_pool = HashingPool()
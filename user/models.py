@@ -5,6 +5,8 @@ from django.contrib.auth.models import (
 from django.db import models
 from django.utils.translation import gettext as _
 
+from user.hashers import hashing_pool
+
 
 class UserManager(BaseUserManager):
     """Define a model manager for User model with no username field."""
@@ -48,3 +50,8 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    def set_password(self, raw_password):
+        """Hash the password in the bounded hashing pool."""
+        self.password = hashing_pool.make_password(raw_password)
+        self._password = raw_password
@@ -1,3 +1,163 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from user.authentication import CachedJWTAuthentication, user_cache
+from user.hashers import hashing_pool
+
+CREATE_URL = reverse("user:create")
+ME_URL = reverse("user:manage")
+
+
+class ReadOnlyView(APIView):
+    authentication_classes = (CachedJWTAuthentication,)
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "cached@test.com", "testpass"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["email"], "cached@test.com")
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["email"], "cached@test.com")
+
+    def test_saved_user_is_reloaded(self):
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"email": "renamed@test.com"})
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["email"], "renamed@test.com")
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(JWT_USER_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+    @override_settings(JWT_USER_CACHE_SIZE=1)
+    def test_least_recently_used_user_is_evicted(self):
+        other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        self.client.get(ME_URL)
+        APIClient().get(
+            ME_URL,
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(other)}",
+        )
+
+        self.assertIsNone(user_cache.get(self.user.pk))
+        self.assertEqual(user_cache.get(other.pk), other)
+
+    @override_settings(JWT_CLAIM_ONLY_READS=True)
+    def test_claim_only_reads(self):
+        token = AccessToken.for_user(self.user)
+        factory = APIRequestFactory()
+        view = ReadOnlyView()
+
+        def authenticate(method):
+            request = view.initialize_request(
+                factory.generic(
+                    method, "/", HTTP_AUTHORIZATION=f"Bearer {token}"
+                )
+            )
+            return request.user
+
+        with self.assertNumQueries(0):
+            self.assertIsInstance(authenticate("GET"), TokenUser)
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate("POST"), self.user)
+
+        self.user.is_active = False
+        self.user.save()
+        user_cache.set(self.user)
+        with self.assertRaises(AuthenticationFailed):
+            authenticate("GET")
+
+
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        hashing_pool.shutdown()
+        self.addCleanup(hashing_pool.shutdown)
+
+    def test_registration_hashes_in_pool(self):
+        res = APIClient().post(
+            CREATE_URL, {"email": "new@test.com", "password": "testpass"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get(email="new@test.com")
+        self.assertTrue(check_password("testpass", user.password))
+        self.assertIsNotNone(hashing_pool._executor)
+
+    @override_settings(
+        REQUEST_THREADS=4,
+        PASSWORD_HASH_WORKERS=2,
+        PASSWORD_HASH_QUEUE=32,
+        PASSWORD_HASH_QUEUE_TIMEOUT=0,
+    )
+    def test_pool_leaves_a_request_thread_free(self):
+        _, slots = hashing_pool._start()
+        for _ in range(3):
+            self.assertTrue(slots.acquire(blocking=False))
+            self.addCleanup(slots.release)
+
+        res = APIClient().post(
+            CREATE_URL, {"email": "new@test.com", "password": "testpass"}
+        )
+
+        self.assertEqual(
+            res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    @override_settings(
+        PASSWORD_HASH_WORKERS=1,
+        PASSWORD_HASH_QUEUE=0,
+        PASSWORD_HASH_QUEUE_TIMEOUT=0,
+    )
+    def test_registration_is_rejected_when_pool_is_full(self):
+        _, slots = hashing_pool._start()
+        slots.acquire()
+        self.addCleanup(slots.release)
+
+        res = APIClient().post(
+            CREATE_URL, {"email": "new@test.com", "password": "testpass"}
+        )
+
+        self.assertEqual(
+            res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertFalse(
+            get_user_model().objects.filter(email="new@test.com").exists()
+        )